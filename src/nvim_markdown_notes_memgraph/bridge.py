@@ -18,14 +18,25 @@ Actions:
     - health_check: Check if connection is alive
     - update_note: Update a note and its relationships in the graph
     - delete_note: Remove a note and its relationships from the graph
-    - query: Execute a Cypher query
+    - query: Execute a Cypher query (optional "limit" caps returned rows)
     - reindex: Rebuild the entire graph from scratch
+    - gc: Remove tags and persons that are no longer referenced
+
+Ordering:
+    Responses carry no request id, so commands are executed one at a time
+    on a single connection and answered in the order they were received.
+    This also gives read-your-writes: a query sent after update_note sees
+    the update. Only response encoding runs concurrently (writer thread).
 """
 
 import json
 import sys
 import hashlib
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, Any
 
@@ -37,12 +48,225 @@ try:
 except ImportError:
     HAS_MGCLIENT = False
 
+# orjson is optional; it serializes large query results much faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 encoded JSON."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 encoded JSON.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    need to handle the latter.
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Bytes read from stdin per os.read() call in run()
+READ_CHUNK_SIZE = 65536
+
+# Reconnect attempts after a lost connection, and the first backoff delay
+# in seconds (doubled after each failed attempt)
+RECONNECT_ATTEMPTS = 3
+RECONNECT_BACKOFF = 0.05
+
+# Seconds of inactivity after which run() pings Memgraph to keep the
+# connection warm
+KEEPALIVE_INTERVAL = 30
+
+# Maximum responses waiting for the writer thread before run() blocks
+OUTPUT_QUEUE_SIZE = 64
+
+# Queued to stop the writer thread
+_STOP_WRITER = object()
+
+# Cypher templates are kept as module constants so every call sends the
+# identical query text and Memgraph's plan cache hits on each execution
+
+# (label, property) pairs to index
+SCHEMA_INDEXES = (
+    ("Note", "path"),
+    ("Note", "filename"),
+    ("Person", "name"),
+    ("Tag", "name"),
+)
+
+SHOW_INDEXES = "SHOW INDEX INFO"
+
+PING = "RETURN 1"
+
+NOTE_HASH = """
+    MATCH (n:Note {path: $path})
+    RETURN n.content_hash
+"""
+
+# Merge the note node and drop its existing outgoing relationships in the
+# same round-trip. Buffer content may not match the file on disk, so every
+# note write clears the mtime the MCP server's reindex uses to skip reading
+# unchanged files.
+MERGE_NOTE = """
+    MERGE (n:Note {path: $path})
+    SET n.title = $title,
+        n.title_lower = toLower($title),
+        n.filename = $filename,
+        n.filename_lower = toLower($filename),
+        n.content_hash = $content_hash,
+        n.mtime_ns = null,
+        n.last_modified = $last_modified
+    WITH n
+    OPTIONAL MATCH (n)-[r:LINKS_TO|MENTIONS|HAS_TAG]->()
+    WITH n, collect(r) AS rels
+    FOREACH (r IN rels | DELETE r)
+"""
+
+# A note that does not exist yet has no relationships to drop
+CREATE_NOTE = """
+    MERGE (n:Note {path: $path})
+    SET n.title = $title,
+        n.title_lower = toLower($title),
+        n.filename = $filename,
+        n.filename_lower = toLower($filename),
+        n.content_hash = $content_hash,
+        n.mtime_ns = null,
+        n.last_modified = $last_modified
+"""
+
+NOTE_UNWIND = """
+    UNWIND $rows AS row
+    MERGE (n:Note {path: row.path})
+    SET n.title = row.title,
+        n.title_lower = toLower(row.title),
+        n.filename = row.filename,
+        n.filename_lower = toLower(row.filename),
+        n.content_hash = row.content_hash,
+        n.mtime_ns = null,
+        n.last_modified = row.last_modified
+"""
+
+# Each relationship query first merges the distinct target nodes once, then
+# matches them per row, so a tag used in many notes is merged once
+LINK_UNWIND = """
+    UNWIND $keys AS key
+    MERGE (:Note {path: key})
+    WITH count(*) AS merged
+    UNWIND $rows AS row
+    MATCH (source:Note {path: row.source_path})
+    MATCH (target:Note {path: row.target_path})
+    MERGE (source)-[r:LINKS_TO {line_number: row.line_number}]->(target)
+"""
+
+MENTION_UNWIND = """
+    UNWIND $keys AS key
+    MERGE (:Person {name: key})
+    WITH count(*) AS merged
+    UNWIND $rows AS row
+    MATCH (source:Note {path: row.source_path})
+    MATCH (person:Person {name: row.name})
+    MERGE (source)-[r:MENTIONS {line_number: row.line_number}]->(person)
+"""
+
+TAG_UNWIND = """
+    UNWIND $keys AS key
+    MERGE (:Tag {name: key})
+    WITH count(*) AS merged
+    UNWIND $rows AS row
+    MATCH (source:Note {path: row.source_path})
+    MATCH (tag:Tag {name: row.name})
+    MERGE (source)-[r:HAS_TAG {line_number: row.line_number}]->(tag)
+"""
+
+PERSON_NOTE_UNWIND = """
+    UNWIND $rows AS row
+    MERGE (person:Person {name: row.person_name})
+    SET person.display_name = row.person_name
+    WITH person, row
+    MATCH (note:Note {path: row.path})
+    MERGE (person)-[:HAS_NOTE]->(note)
+"""
+
+CLEAR_GRAPH = "MATCH (n) DETACH DELETE n"
+
+# Delete the note and any tag or person left without relationships by the
+# deletion. Only the note's own neighbours are checked, so the cost does not
+# grow with the size of the graph.
+DELETE_NOTE = """
+    MATCH (n:Note {path: $path})
+    OPTIONAL MATCH (n)-[:HAS_TAG]->(t:Tag)
+    WITH n, collect(DISTINCT t) AS tags
+    OPTIONAL MATCH (n)-[:MENTIONS]->(p:Person)
+    WITH n, tags, collect(DISTINCT p) AS mentioned
+    OPTIONAL MATCH (owner:Person)-[:HAS_NOTE]->(n)
+    WITH n, tags + mentioned + collect(DISTINCT owner) AS candidates
+    DETACH DELETE n
+    WITH candidates
+    UNWIND candidates AS c
+    WITH DISTINCT c
+    WHERE (c:Tag AND NOT (c)<-[:HAS_TAG]-())
+       OR (c:Person AND NOT (c)<-[:MENTIONS]-() AND NOT (c)-[:HAS_NOTE]->())
+    DELETE c
+"""
+
+# Full-graph orphan cleanup, run by the gc action
+DELETE_ORPHAN_TAGS = """
+    MATCH (t:Tag)
+    WHERE NOT (t)<-[:HAS_TAG]-()
+    DELETE t
+"""
+
+DELETE_ORPHAN_PERSONS = """
+    MATCH (p:Person)
+    WHERE NOT (p)<-[:MENTIONS]-() AND NOT (p)-[:HAS_NOTE]->()
+    DELETE p
+"""
+
+# Count nodes and relationships by type in one round-trip. OPTIONAL MATCH
+# keeps the row alive when a label or relationship type has no entries.
+STATS_QUERY = """
+    OPTIONAL MATCH (n:Note)
+    WITH count(n) AS notes
+    OPTIONAL MATCH (p:Person)
+    WITH notes, count(p) AS persons
+    OPTIONAL MATCH (t:Tag)
+    WITH notes, persons, count(t) AS tags
+    OPTIONAL MATCH ()-[l:LINKS_TO]->()
+    WITH notes, persons, tags, count(l) AS links
+    OPTIONAL MATCH ()-[m:MENTIONS]->()
+    WITH notes, persons, tags, links, count(m) AS mentions
+    OPTIONAL MATCH ()-[h:HAS_TAG]->()
+    RETURN notes, persons, tags, links, mentions, count(h) AS tag_usages
+"""
+
+STATS_KEYS = ("notes", "persons", "tags", "links", "mentions", "tag_usages")
+
 
 class MemgraphBridge:
     def __init__(self):
         self.connection: Optional[Any] = None
+        self._cursor: Optional[Any] = None
+        self._out_q: Optional[queue.Queue] = None
         self.host: str = "localhost"
         self.port: int = 7687
+        # Set once connect() succeeds; lost connections are then reopened
+        self._reconnect: bool = False
+        # Set when a health check fails; the next command reconnects
+        self._degraded: bool = False
+        # Serializes command dispatch with the keepalive thread
+        self._lock = threading.Lock()
+        self._last_activity: float = time.monotonic()
+        # (label, property) indexes known to exist on this connection
+        self._existing_indexes: Optional[set] = None
 
     def send_response(self, success: bool, data: Any = None, error: str = None):
         """Send a JSON response to stdout."""
@@ -51,7 +275,38 @@ class MemgraphBridge:
             "data": data,
             "error": error
         }
-        print(json.dumps(response), flush=True)
+        if self._out_q is not None:
+            # run() hands encoding and writing to the writer thread
+            self._out_q.put(response)
+        else:
+            self._write_response(response)
+            sys.stdout.buffer.flush()
+
+    def _write_response(self, response: dict):
+        """Encode a response and write it to the stdout buffer."""
+        try:
+            encoded = _dumps(response)
+        except Exception as e:
+            encoded = _dumps({
+                "success": False,
+                "data": None,
+                "error": f"Failed to encode response: {str(e)}"
+            })
+        sys.stdout.buffer.write(encoded + b"\n")
+
+    def _writer_loop(self, out_q: queue.Queue):
+        """Write queued responses in order, flushing whenever the queue drains."""
+        while True:
+            response = out_q.get()
+            if response is _STOP_WRITER:
+                break
+            try:
+                self._write_response(response)
+                if out_q.empty():
+                    sys.stdout.buffer.flush()
+            except OSError:
+                # stdout is gone; keep draining so the reader never blocks
+                pass
 
     def connect(self, host: str = "localhost", port: int = 7687) -> bool:
         """Establish connection to Memgraph."""
@@ -63,156 +318,193 @@ class MemgraphBridge:
         self.port = port
 
         try:
-            self.connection = mgclient.connect(host=host, port=port)
-            self.connection.autocommit = True
-            self._ensure_schema()
+            self._open_connection()
+            self._reconnect = True
             self.send_response(True, data={"message": f"Connected to Memgraph at {host}:{port}"})
             return True
         except Exception as e:
-            self.connection = None
             self.send_response(False, error=f"Failed to connect: {str(e)}")
             return False
 
+    def _open_connection(self):
+        """Open a fresh connection to self.host:self.port."""
+        self.connection = None
+        self._cursor = None
+        self._degraded = False
+        self._existing_indexes = None
+        connection = mgclient.connect(host=self.host, port=self.port)
+        connection.autocommit = True
+        self.connection = connection
+        self._ensure_schema()
+
+    def _get_conn(self) -> bool:
+        """Make sure a usable connection exists, reconnecting if it was lost.
+
+        Reconnecting is only attempted after a successful connect(), with
+        exponential backoff between attempts. Returns False if no usable
+        connection could be obtained.
+        """
+        if self.connection is not None and not self._degraded and not (
+            HAS_MGCLIENT and self.connection.status in (
+                mgclient.CONN_STATUS_BAD, mgclient.CONN_STATUS_CLOSED)
+        ):
+            return True
+
+        if not (HAS_MGCLIENT and self._reconnect):
+            return False
+
+        for attempt in range(RECONNECT_ATTEMPTS):
+            if attempt:
+                time.sleep(RECONNECT_BACKOFF * 2 ** (attempt - 1))
+            try:
+                self._open_connection()
+                return True
+            except Exception:
+                self.connection = None
+                self._cursor = None
+
+        return False
+
     def _ensure_schema(self):
-        """Ensure indexes exist for optimal query performance."""
+        """Ensure indexes exist for optimal query performance.
+
+        Existing indexes are read once per connection; later calls only
+        create indexes that are still missing, which is usually none.
+        """
         if not self.connection:
             return
 
-        cursor = self.connection.cursor()
+        cursor = self._get_cursor()
+
+        if self._existing_indexes is None:
+            self._existing_indexes = set()
+            try:
+                cursor.execute(SHOW_INDEXES)
+                for row in cursor.fetchall():
+                    label, prop = row[1], row[2]
+                    if isinstance(prop, list):
+                        # Newer servers list the indexed properties
+                        prop = ", ".join(prop)
+                    self._existing_indexes.add((label, prop))
+            except Exception:
+                # Fall back to creating every index
+                pass
 
         # Create indexes for faster lookups
-        indexes = [
-            "CREATE INDEX ON :Note(path)",
-            "CREATE INDEX ON :Note(filename)",
-            "CREATE INDEX ON :Person(name)",
-            "CREATE INDEX ON :Tag(name)",
-        ]
-
-        for index_query in indexes:
+        for label, prop in SCHEMA_INDEXES:
+            if (label, prop) in self._existing_indexes:
+                continue
             try:
-                cursor.execute(index_query)
+                cursor.execute(f"CREATE INDEX ON :{label}({prop})")
             except Exception:
                 # Index might already exist
                 pass
+            self._existing_indexes.add((label, prop))
+
+    def _get_cursor(self):
+        """Return the cursor for the current connection, creating it once."""
+        if self._cursor is None:
+            self._cursor = self.connection.cursor()
+        return self._cursor
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed queries in a single explicit transaction.
+
+        Yields a cursor; the transaction is committed when the block exits
+        normally and rolled back if it raises. Autocommit is restored either
+        way, or the connection dropped if that fails. Code running inside
+        the block must not commit on its own.
+        """
+        self.connection.autocommit = False
+        try:
+            yield self._get_cursor()
+            self.connection.commit()
+        except Exception:
+            try:
+                self.connection.rollback()
+            except Exception:
+                # Connection is unusable; surface the original error
+                pass
+            raise
+        finally:
+            self._restore_autocommit()
+
+    def _restore_autocommit(self):
+        """Switch the connection back to autocommit after a transaction.
+
+        pymgclient refuses once the connection has gone bad, e.g. after a
+        failed rollback. The connection is then dropped so the next command
+        reconnects, and the error that ended the transaction is not masked.
+        """
+        try:
+            self.connection.autocommit = True
+        except Exception:
+            self.connection = None
+            self._cursor = None
 
     def health_check(self) -> bool:
         """Check if connection is alive."""
-        if not self.connection:
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("RETURN 1")
+            cursor = self._get_cursor()
+            cursor.execute(PING)
             cursor.fetchall()
             self.send_response(True, data={"status": "healthy"})
             return True
         except Exception as e:
-            self.connection = None
+            # Keep host/port; the next command reconnects
+            self._degraded = True
+            self._cursor = None
             self.send_response(False, error=f"Health check failed: {str(e)}")
             return False
 
     def _compute_content_hash(self, content: str) -> str:
-        """Compute a hash of the content for change detection."""
-        return hashlib.md5(content.encode()).hexdigest()
+        """Compute a hash of the content for change detection.
+
+        SHA-256 is used because OpenSSL runs it on the CPU's SHA extensions,
+        which is considerably faster than MD5. Must match the server's hash.
+        """
+        return hashlib.sha256(content.encode()).hexdigest()
 
     def update_note(self, path: str, title: str, content: str,
                     wikilinks: list, mentions: list, hashtags: list) -> bool:
         """Update a note and its relationships in the graph."""
-        if not self.connection:
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-            filename = os.path.basename(path)
             content_hash = self._compute_content_hash(content)
-            last_modified = datetime.now().isoformat()
-
-            # Merge the note node
-            cursor.execute("""
-                MERGE (n:Note {path: $path})
-                SET n.title = $title,
-                    n.filename = $filename,
-                    n.content_hash = $content_hash,
-                    n.last_modified = $last_modified
-                RETURN n
-            """, {
-                "path": path,
-                "title": title,
-                "filename": filename,
-                "content_hash": content_hash,
-                "last_modified": last_modified
-            })
 
-            # Delete existing relationships from this note
-            cursor.execute("""
-                MATCH (n:Note {path: $path})-[r:LINKS_TO|MENTIONS|HAS_TAG]->()
-                DELETE r
-            """, {"path": path})
-
-            # Create wikilink relationships
-            for link in wikilinks:
-                target_path = link.get("target_path")
-                line_number = link.get("line_number", 0)
-                if target_path:
-                    cursor.execute("""
-                        MATCH (source:Note {path: $source_path})
-                        MERGE (target:Note {path: $target_path})
-                        MERGE (source)-[r:LINKS_TO {line_number: $line_number}]->(target)
-                    """, {
-                        "source_path": path,
-                        "target_path": target_path,
-                        "line_number": line_number
+            with self._transaction() as cursor:
+                # Skip the rewrite when the note content is unchanged
+                cursor.execute(NOTE_HASH, {"path": path})
+                existing = cursor.fetchone()
+                if existing and existing[0] == content_hash:
+                    self.send_response(True, data={
+                        "path": path,
+                        "unchanged": True,
+                        "wikilinks_count": len(wikilinks),
+                        "mentions_count": len(mentions),
+                        "hashtags_count": len(hashtags)
                     })
+                    return True
 
-            # Create mention relationships
-            for mention in mentions:
-                person_name = mention.get("name")
-                line_number = mention.get("line_number", 0)
-                if person_name:
-                    cursor.execute("""
-                        MATCH (source:Note {path: $source_path})
-                        MERGE (person:Person {name: $person_name})
-                        MERGE (source)-[r:MENTIONS {line_number: $line_number}]->(person)
-                    """, {
-                        "source_path": path,
-                        "person_name": person_name,
-                        "line_number": line_number
-                    })
+                rows = self._new_rows()
+                self._add_note_rows(rows, path, title, content_hash,
+                                    wikilinks, mentions, hashtags)
 
-            # Create hashtag relationships
-            for tag in hashtags:
-                tag_name = tag.get("name")
-                line_number = tag.get("line_number", 0)
-                if tag_name:
-                    cursor.execute("""
-                        MATCH (source:Note {path: $source_path})
-                        MERGE (tag:Tag {name: $tag_name})
-                        MERGE (source)-[r:HAS_TAG {line_number: $line_number}]->(tag)
-                    """, {
-                        "source_path": path,
-                        "tag_name": tag_name,
-                        "line_number": line_number
-                    })
+                cursor.execute(MERGE_NOTE if existing else CREATE_NOTE, rows["notes"][0])
 
-            # Check if this is a person note (in people directory)
-            # and create HAS_NOTE relationship
-            if "/people/" in path:
-                person_name = os.path.splitext(filename)[0]
-                cursor.execute("""
-                    MERGE (person:Person {name: $person_name})
-                    SET person.display_name = $person_name
-                    WITH person
-                    MATCH (note:Note {path: $path})
-                    MERGE (person)-[:HAS_NOTE]->(note)
-                """, {
-                    "person_name": person_name,
-                    "path": path
-                })
+                self._write_relationship_rows(cursor, rows)
 
             self.send_response(True, data={
                 "path": path,
+                "unchanged": False,
                 "wikilinks_count": len(wikilinks),
                 "mentions_count": len(mentions),
                 "hashtags_count": len(hashtags)
@@ -225,31 +517,15 @@ class MemgraphBridge:
 
     def delete_note(self, path: str) -> bool:
         """Remove a note and its relationships from the graph."""
-        if not self.connection:
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-
-            # Delete the note and all its relationships
-            cursor.execute("""
-                MATCH (n:Note {path: $path})
-                DETACH DELETE n
-            """, {"path": path})
-
-            # Clean up orphaned tags and persons (no relationships)
-            cursor.execute("""
-                MATCH (t:Tag)
-                WHERE NOT (t)<-[:HAS_TAG]-()
-                DELETE t
-            """)
-
-            cursor.execute("""
-                MATCH (p:Person)
-                WHERE NOT (p)<-[:MENTIONS]-() AND NOT (p)-[:HAS_NOTE]->()
-                DELETE p
-            """)
+            cursor = self._get_cursor()
+
+            # Delete the note, its relationships and any orphaned neighbours
+            cursor.execute(DELETE_NOTE, {"path": path})
 
             self.send_response(True, data={"deleted": path})
             return True
@@ -258,75 +534,130 @@ class MemgraphBridge:
             self.send_response(False, error=f"Failed to delete note: {str(e)}")
             return False
 
-    def query(self, cypher: str, params: dict = None) -> bool:
-        """Execute a Cypher query and return results."""
-        if not self.connection:
+    def gc(self) -> bool:
+        """Remove every tag and person without relationships from the graph."""
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(cypher, params or {})
+            with self._transaction() as cursor:
+                cursor.execute(DELETE_ORPHAN_TAGS)
+                cursor.execute(DELETE_ORPHAN_PERSONS)
+
+            self.send_response(True, data={"status": "collected"})
+            return True
+
+        except Exception as e:
+            self.send_response(False, error=f"Garbage collection failed: {str(e)}")
+            return False
 
-            # Fetch results
-            rows = cursor.fetchall()
+    def query(self, cypher: str, params: dict = None, limit: Optional[int] = None) -> bool:
+        """Execute a Cypher query and return results.
+
+        The connection is not lazy, so execute() already holds the whole
+        result set; limit only caps how many rows are converted and sent
+        back, and the response is marked as truncated if more were
+        available. Put a LIMIT in the Cypher to bound the work Memgraph
+        does.
+        """
+        # bool is an int subclass, but "limit": true is not a row count
+        if limit is not None and (
+            not isinstance(limit, int) or isinstance(limit, bool) or limit < 0
+        ):
+            self.send_response(
+                False, error=f"Invalid limit: {limit!r} (expected a non-negative integer)"
+            )
+            return False
+
+        if not self._get_conn():
+            self.send_response(False, error="Not connected")
+            return False
+
+        try:
+            cursor = self._get_cursor()
+            cursor.execute(cypher, params or {})
 
-            # Convert results to serializable format
             results = []
-            for row in rows:
-                row_data = []
-                for item in row:
-                    if hasattr(item, 'properties'):
-                        # Node or relationship
-                        row_data.append(dict(item.properties))
-                    else:
-                        row_data.append(item)
-                results.append(row_data)
-
-            self.send_response(True, data={"results": results, "count": len(results)})
+            truncated = False
+
+            # Write-only statements have no result columns; skip the fetch
+            if cursor.description:
+                rows = cursor.fetchall()
+                if limit is not None and len(rows) > limit:
+                    rows = rows[:limit]
+                    truncated = True
+                results = [self._convert_row(row) for row in rows]
+
+            data = {"results": results, "count": len(results)}
+            if limit is not None:
+                data["truncated"] = truncated
+            self.send_response(True, data=data)
             return True
 
         except Exception as e:
             self.send_response(False, error=f"Query failed: {str(e)}")
             return False
 
+    @staticmethod
+    def _convert_row(row) -> list:
+        """Convert a result row to a serializable list."""
+        row_data = []
+        for item in row:
+            if hasattr(item, 'properties'):
+                # Node or relationship
+                row_data.append(dict(item.properties))
+            else:
+                row_data.append(item)
+        return row_data
+
     def reindex(self, notes: list) -> bool:
         """Rebuild the entire graph from a list of notes."""
-        if not self.connection:
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-
-            # Clear the entire graph
-            cursor.execute("MATCH (n) DETACH DELETE n")
-
-            # Re-ensure schema
-            self._ensure_schema()
-
-            # Index each note
+            # Collect rows for every note up front so each label and
+            # relationship type is written with a single UNWIND query
+            rows = self._new_rows()
+            last_modified = datetime.now().isoformat()
             indexed = 0
             errors = []
 
             for note in notes:
                 try:
                     path = note.get("path", "")
-                    title = note.get("title", "")
-                    content = note.get("content", "")
-                    wikilinks = note.get("wikilinks", [])
-                    mentions = note.get("mentions", [])
-                    hashtags = note.get("hashtags", [])
-
-                    # Temporarily suppress individual responses
-                    self._update_note_internal(
-                        cursor, path, title, content,
-                        wikilinks, mentions, hashtags
+                    if not path:
+                        raise ValueError("Missing note path")
+
+                    self._add_note_rows(
+                        rows, path,
+                        note.get("title", ""),
+                        self._compute_content_hash(note.get("content", "")),
+                        note.get("wikilinks", []),
+                        note.get("mentions", []),
+                        note.get("hashtags", []),
+                        last_modified
                     )
                     indexed += 1
                 except Exception as e:
                     errors.append({"path": note.get("path", "unknown"), "error": str(e)})
 
+            # Re-ensure schema (index changes are not allowed inside an
+            # explicit transaction); free once the indexes are known
+            self._ensure_schema()
+
+            # Clear and rebuild the graph in one transaction so a failed
+            # reindex leaves the previous graph intact
+            with self._transaction() as cursor:
+                cursor.execute(CLEAR_GRAPH)
+
+                if rows["notes"]:
+                    cursor.execute(NOTE_UNWIND, {"rows": rows["notes"]})
+
+                self._write_relationship_rows(cursor, rows)
+
             self.send_response(True, data={
                 "indexed": indexed,
                 "total": len(notes),
@@ -338,117 +669,118 @@ class MemgraphBridge:
             self.send_response(False, error=f"Reindex failed: {str(e)}")
             return False
 
-    def _update_note_internal(self, cursor, path: str, title: str, content: str,
-                               wikilinks: list, mentions: list, hashtags: list):
-        """Internal method to update a note without sending response."""
-        filename = os.path.basename(path)
-        content_hash = self._compute_content_hash(content)
-        last_modified = datetime.now().isoformat()
-
-        # Merge the note node
-        cursor.execute("""
-            MERGE (n:Note {path: $path})
-            SET n.title = $title,
-                n.filename = $filename,
-                n.content_hash = $content_hash,
-                n.last_modified = $last_modified
-        """, {
+    def _new_rows(self) -> dict:
+        """Create empty UNWIND row lists, one per label/relationship type."""
+        return {
+            "notes": [],
+            "links": [],
+            "mentions": [],
+            "tags": [],
+            "person_notes": [],
+        }
+
+    def _add_note_rows(self, rows: dict, path: str, title: str, content_hash: str,
+                       wikilinks: list, mentions: list, hashtags: list,
+                       last_modified: Optional[str] = None):
+        """Append the UNWIND rows describing a single note to rows.
+
+        last_modified defaults to the current time; batch callers pass one
+        shared timestamp instead of sampling the clock per note.
+        """
+        # Paths from Neovim are '/'-separated, as the people check assumes
+        filename = path.rpartition("/")[2]
+
+        rows["notes"].append({
             "path": path,
             "title": title,
             "filename": filename,
             "content_hash": content_hash,
-            "last_modified": last_modified
+            "last_modified": last_modified or datetime.now().isoformat()
         })
 
+        # Duplicate (target, line) pairs would MERGE the same relationship
+        for target_path, line_number in self._unique_refs(wikilinks, "target_path"):
+            rows["links"].append({
+                "source_path": path,
+                "target_path": target_path,
+                "line_number": line_number
+            })
+
+        for person_name, line_number in self._unique_refs(mentions, "name"):
+            rows["mentions"].append({
+                "source_path": path,
+                "name": person_name,
+                "line_number": line_number
+            })
+
+        for tag_name, line_number in self._unique_refs(hashtags, "name"):
+            rows["tags"].append({
+                "source_path": path,
+                "name": tag_name,
+                "line_number": line_number
+            })
+
+        # Check if this is a person note (in people directory)
+        if "/people/" in path:
+            rows["person_notes"].append({
+                "person_name": filename.rpartition(".")[0] or filename,
+                "path": path
+            })
+
+    @staticmethod
+    def _unique_refs(entities: list, key: str) -> list:
+        """Return distinct (entities[key], line_number) pairs, skipping empty keys."""
+        return list(dict.fromkeys(
+            (entity[key], entity.get("line_number", 0))
+            for entity in entities
+            if entity.get(key)
+        ))
+
+    @staticmethod
+    def _distinct(rows: list, key: str) -> list:
+        """Return the distinct values of key across rows, in first-seen order."""
+        return list(dict.fromkeys(row[key] for row in rows))
+
+    def _write_relationship_rows(self, cursor, rows: dict):
+        """Write collected relationship rows with one UNWIND query per type.
+
+        Runs inside the caller's transaction and must not commit.
+        """
         # Create wikilink relationships
-        for link in wikilinks:
-            target_path = link.get("target_path")
-            line_number = link.get("line_number", 0)
-            if target_path:
-                cursor.execute("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (target:Note {path: $target_path})
-                    MERGE (source)-[r:LINKS_TO {line_number: $line_number}]->(target)
-                """, {
-                    "source_path": path,
-                    "target_path": target_path,
-                    "line_number": line_number
-                })
+        if rows["links"]:
+            cursor.execute(LINK_UNWIND, {
+                "keys": self._distinct(rows["links"], "target_path"),
+                "rows": rows["links"]
+            })
 
         # Create mention relationships
-        for mention in mentions:
-            person_name = mention.get("name")
-            line_number = mention.get("line_number", 0)
-            if person_name:
-                cursor.execute("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (person:Person {name: $person_name})
-                    MERGE (source)-[r:MENTIONS {line_number: $line_number}]->(person)
-                """, {
-                    "source_path": path,
-                    "person_name": person_name,
-                    "line_number": line_number
-                })
+        if rows["mentions"]:
+            cursor.execute(MENTION_UNWIND, {
+                "keys": self._distinct(rows["mentions"], "name"),
+                "rows": rows["mentions"]
+            })
 
         # Create hashtag relationships
-        for tag in hashtags:
-            tag_name = tag.get("name")
-            line_number = tag.get("line_number", 0)
-            if tag_name:
-                cursor.execute("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (tag:Tag {name: $tag_name})
-                    MERGE (source)-[r:HAS_TAG {line_number: $line_number}]->(tag)
-                """, {
-                    "source_path": path,
-                    "tag_name": tag_name,
-                    "line_number": line_number
-                })
-
-        # Check if this is a person note
-        if "/people/" in path:
-            person_name = os.path.splitext(filename)[0]
-            cursor.execute("""
-                MERGE (person:Person {name: $person_name})
-                SET person.display_name = $person_name
-                WITH person
-                MATCH (note:Note {path: $path})
-                MERGE (person)-[:HAS_NOTE]->(note)
-            """, {
-                "person_name": person_name,
-                "path": path
+        if rows["tags"]:
+            cursor.execute(TAG_UNWIND, {
+                "keys": self._distinct(rows["tags"], "name"),
+                "rows": rows["tags"]
             })
 
+        # Create HAS_NOTE relationships for person notes
+        if rows["person_notes"]:
+            cursor.execute(PERSON_NOTE_UNWIND, {"rows": rows["person_notes"]})
+
     def get_stats(self) -> bool:
         """Get graph statistics."""
-        if not self.connection:
+        if not self._get_conn():
             self.send_response(False, error="Not connected")
             return False
 
         try:
-            cursor = self.connection.cursor()
-
-            stats = {}
-
-            # Count nodes by type
-            cursor.execute("MATCH (n:Note) RETURN count(n) as count")
-            stats["notes"] = cursor.fetchone()[0]
-
-            cursor.execute("MATCH (n:Person) RETURN count(n) as count")
-            stats["persons"] = cursor.fetchone()[0]
-
-            cursor.execute("MATCH (n:Tag) RETURN count(n) as count")
-            stats["tags"] = cursor.fetchone()[0]
-
-            # Count relationships by type
-            cursor.execute("MATCH ()-[r:LINKS_TO]->() RETURN count(r) as count")
-            stats["links"] = cursor.fetchone()[0]
-
-            cursor.execute("MATCH ()-[r:MENTIONS]->() RETURN count(r) as count")
-            stats["mentions"] = cursor.fetchone()[0]
-
-            cursor.execute("MATCH ()-[r:HAS_TAG]->() RETURN count(r) as count")
-            stats["tag_usages"] = cursor.fetchone()[0]
+            cursor = self._get_cursor()
+            cursor.execute(STATS_QUERY)
+            stats = dict(zip(STATS_KEYS, cursor.fetchone()))
 
             self.send_response(True, data=stats)
             return True
@@ -458,61 +790,138 @@ class MemgraphBridge:
             return False
 
     def run(self):
-        """Main loop: read JSON commands from stdin, execute, respond on stdout."""
-        while True:
-            try:
-                line = sys.stdin.readline()
-                if not line:
+        """Main loop: read JSON commands from stdin, execute, respond on stdout.
+
+        Input is drained in large chunks. Responses are encoded and written
+        by a single writer thread, in order, so the loop can dispatch the
+        next command while a large result is still being serialized. The
+        writer flushes whenever it has caught up.
+        """
+        stdin_fd = sys.stdin.fileno()
+        pending = []
+        out_q = queue.Queue(maxsize=OUTPUT_QUEUE_SIZE)
+        writer = threading.Thread(target=self._writer_loop, args=(out_q,), daemon=True)
+        writer.start()
+        self._out_q = out_q
+        stop_keepalive = threading.Event()
+        keepalive = threading.Thread(
+            target=self._keepalive_loop, args=(stop_keepalive,), daemon=True
+        )
+        keepalive.start()
+        try:
+            while True:
+                chunk = os.read(stdin_fd, READ_CHUNK_SIZE)
+                if not chunk:
                     break
 
-                line = line.strip()
-                if not line:
-                    continue
+                # Only the new chunk is scanned; earlier pieces of a long
+                # line are joined once, when its newline arrives
+                start = 0
+                end = chunk.find(b"\n")
+                while end != -1:
+                    pending.append(chunk[start:end])
+                    line = b"".join(pending)
+                    pending.clear()
+                    if not self._handle_line(line):
+                        return
+                    start = end + 1
+                    end = chunk.find(b"\n", start)
+                if start < len(chunk):
+                    pending.append(chunk[start:])
+
+            # Handle a final command that was not newline-terminated
+            self._handle_line(b"".join(pending))
+        finally:
+            stop_keepalive.set()
+            keepalive.join()
+            self._out_q = None
+            out_q.put(_STOP_WRITER)
+            writer.join()
+            sys.stdout.buffer.flush()
+
+    def _keepalive_loop(self, stop: threading.Event):
+        """Ping Memgraph whenever the connection has been idle for a while."""
+        while not stop.wait(KEEPALIVE_INTERVAL):
+            if time.monotonic() - self._last_activity < KEEPALIVE_INTERVAL:
+                continue
+            # Never wait on a running command; it keeps the socket busy anyway
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self.connection is not None and not self._degraded:
+                    cursor = self._get_cursor()
+                    cursor.execute(PING)
+                    cursor.fetchall()
+            except Exception:
+                self._degraded = True
+                self._cursor = None
+            finally:
+                self._last_activity = time.monotonic()
+                self._lock.release()
+
+    def _handle_line(self, line: bytes) -> bool:
+        """Execute a single JSON command line. Returns False on quit."""
+        with self._lock:
+            try:
+                return self._dispatch(line)
+            finally:
+                self._last_activity = time.monotonic()
 
-                try:
-                    request = json.loads(line)
-                except json.JSONDecodeError as e:
-                    self.send_response(False, error=f"Invalid JSON: {str(e)}")
-                    continue
-
-                action = request.get("action")
-                params = request.get("params", {})
-
-                if action == "connect":
-                    self.connect(
-                        host=params.get("host", "localhost"),
-                        port=params.get("port", 7687)
-                    )
-                elif action == "health_check":
-                    self.health_check()
-                elif action == "update_note":
-                    self.update_note(
-                        path=params.get("path", ""),
-                        title=params.get("title", ""),
-                        content=params.get("content", ""),
-                        wikilinks=params.get("wikilinks", []),
-                        mentions=params.get("mentions", []),
-                        hashtags=params.get("hashtags", [])
-                    )
-                elif action == "delete_note":
-                    self.delete_note(path=params.get("path", ""))
-                elif action == "query":
-                    self.query(
-                        cypher=params.get("cypher", ""),
-                        params=params.get("params", {})
-                    )
-                elif action == "reindex":
-                    self.reindex(notes=params.get("notes", []))
-                elif action == "stats":
-                    self.get_stats()
-                elif action == "quit":
-                    break
-                else:
-                    self.send_response(False, error=f"Unknown action: {action}")
+    def _dispatch(self, line: bytes) -> bool:
+        """Parse and execute a command line. Returns False on quit."""
+        try:
+            line = line.strip()
+            if not line:
+                return True
+
+            try:
+                request = _loads(line)
+            except json.JSONDecodeError as e:
+                self.send_response(False, error=f"Invalid JSON: {str(e)}")
+                return True
+
+            action = request.get("action")
+            params = request.get("params", {})
+
+            if action == "connect":
+                self.connect(
+                    host=params.get("host", "localhost"),
+                    port=params.get("port", 7687)
+                )
+            elif action == "health_check":
+                self.health_check()
+            elif action == "update_note":
+                self.update_note(
+                    path=params.get("path", ""),
+                    title=params.get("title", ""),
+                    content=params.get("content", ""),
+                    wikilinks=params.get("wikilinks", []),
+                    mentions=params.get("mentions", []),
+                    hashtags=params.get("hashtags", [])
+                )
+            elif action == "delete_note":
+                self.delete_note(path=params.get("path", ""))
+            elif action == "query":
+                self.query(
+                    cypher=params.get("cypher", ""),
+                    params=params.get("params", {}),
+                    limit=params.get("limit")
+                )
+            elif action == "reindex":
+                self.reindex(notes=params.get("notes", []))
+            elif action == "stats":
+                self.get_stats()
+            elif action == "gc":
+                self.gc()
+            elif action == "quit":
+                return False
+            else:
+                self.send_response(False, error=f"Unknown action: {action}")
 
-            except Exception as e:
-                self.send_response(False, error=f"Unexpected error: {str(e)}")
+        except Exception as e:
+            self.send_response(False, error=f"Unexpected error: {str(e)}")
 
+        return True
 
 if __name__ == "__main__":
     bridge = MemgraphBridge()
@@ -1,9 +1,11 @@
 """CLI for nvim-markdown-notes-memgraph.
 
 Provides commands for managing Memgraph and MCP server via Docker Compose.
+
+Modules needed by a single subcommand are imported inside that command so
+that cheap commands like status stay fast to start.
 """
 
-import json
 import os
 from pathlib import Path
 
@@ -151,8 +153,17 @@ def config(ctx, memgraph_host, memgraph_port):
         memgraph_port=memgraph_port
     )
 
-    # Output as pretty-printed JSON
-    click.echo(json.dumps(mcp_config, indent=2))
+    # Output as pretty-printed JSON, using orjson when it is installed
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    if orjson is not None:
+        click.echo(orjson.dumps(mcp_config, option=orjson.OPT_INDENT_2))
+    else:
+        import json
+        click.echo(json.dumps(mcp_config, indent=2))
 
 
 @main.command()
@@ -228,6 +239,7 @@ def bridge(ctx, memgraph_host, memgraph_port):
     - query: Execute a Cypher query
     - reindex: Rebuild the entire graph from scratch
     - stats: Get graph statistics
+    - gc: Remove tags and persons that are no longer referenced
 
     Configuration is passed via environment variables:
     - MEMGRAPH_HOST: Memgraph host (default: localhost)
@@ -4,30 +4,124 @@ This module provides functions to start, stop, and check the status of
 Docker Compose services (Memgraph and MCP server).
 """
 
+import functools
+import http.client
 import json
 import os
+import select
+import socket
 import subprocess
 import time
+from importlib.resources import files
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+# orjson is optional; fall back to the stdlib parser
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Memgraph's container name in docker-compose.yml
+_MEMGRAPH_CONTAINER = 'nvim-notes-memgraph'
+
+# `docker inspect` template printing "<state> <health>" (health is empty
+# for containers without a healthcheck)
+_INSPECT_FORMAT = '{{.State.Status}} {{if .State.Health}}{{.State.Health.Status}}{{end}}'
+
+_ENGINE_TIMEOUT = 5.0
+
+# Health polling starts fast and backs off so quick startups return early
+_POLL_INITIAL_DELAY = 0.1
+_POLL_BACKOFF = 1.3
+_POLL_MAX_DELAY = 2.0
+
+# Seconds between `docker inspect` re-checks while `docker events` is quiet.
+# The CLI subscribes some time after it starts, so a health_status event
+# emitted in between is never seen on the stream.
+_EVENT_RECHECK_INTERVAL = 1.0
+
 
 class DockerComposeError(Exception):
     """Raised when Docker Compose operations fail."""
     pass
 
 
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to the Docker Engine API over a unix socket."""
+
+    def __init__(self, socket_path: str, timeout: float = _ENGINE_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def _docker_socket_path() -> Optional[str]:
+    """Return the Engine API unix socket named by DOCKER_HOST, if any.
+
+    The socket is only used when DOCKER_HOST explicitly names one. Without
+    it the docker CLI resolves the active context (colima, rootless,
+    Desktop), which a hardcoded default socket would silently bypass.
+    Platforms without unix sockets always use the CLI.
+    """
+    host = os.environ.get('DOCKER_HOST', '')
+    if not hasattr(socket, 'AF_UNIX') or not host.startswith('unix://'):
+        return None
+    return host[len('unix://'):]
+
+
+def _engine_get(path: str) -> Tuple[int, bytes]:
+    """GET an Engine API path over the docker unix socket.
+
+    Talking to the daemon directly skips starting a docker CLI process.
+
+    Returns:
+        Tuple of (HTTP status, response body)
+
+    Raises:
+        OSError: If the socket is unavailable (callers fall back to the CLI)
+    """
+    socket_path = _docker_socket_path()
+    if socket_path is None:
+        raise OSError("DOCKER_HOST is not a unix socket")
+
+    conn = _UnixHTTPConnection(socket_path)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    except http.client.HTTPException as e:
+        raise OSError(f"Docker Engine API request failed: {e}")
+    finally:
+        conn.close()
+
+
+def _loads(data):
+    """Parse JSON with orjson when installed."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
 def _get_compose_file() -> Path:
     """Get the path to docker-compose.yml.
 
+    The packaged file does not move, so the lookup is done once per process.
+    A missing file raises and is not cached.
+
     Returns:
         Path to docker-compose.yml
 
     Raises:
         DockerComposeError: If docker-compose.yml is not found
     """
-    from importlib.resources import files
-
     compose_file = files("nvim_markdown_notes_memgraph").joinpath("docker-compose.yml")
     path = Path(str(compose_file))
 
@@ -37,6 +131,37 @@ def _get_compose_file() -> Path:
     return path
 
 
+def _parse_ps_output(stdout: str) -> List[Dict]:
+    """Parse `docker compose ps --format json` output with a single parse.
+
+    Compose 2.21+ prints one JSON object per line; older releases print a
+    single JSON array. Both forms are accepted.
+
+    Raises:
+        json.JSONDecodeError: If the output is not valid JSON
+    """
+    stdout = stdout.strip()
+    if not stdout:
+        return []
+
+    if not stdout.startswith('['):
+        stdout = '[' + ','.join(line for line in stdout.splitlines() if line.strip()) + ']'
+
+    return _loads(stdout)
+
+
+def _up_reported_healthy(output: Optional[str]) -> bool:
+    """Check `docker compose up` progress output for a healthy Memgraph.
+
+    Compose prints lines like " Container nvim-notes-memgraph  Healthy"
+    (to stderr) once a dependency's healthcheck has passed.
+    """
+    for line in (output or '').splitlines():
+        if line.split() == ['Container', _MEMGRAPH_CONTAINER, 'Healthy']:
+            return True
+    return False
+
+
 def start_services(notes_root: str, wait_for_health: bool = True, timeout: int = 60) -> None:
     """Start Docker Compose services (Memgraph + MCP server).
 
@@ -51,17 +176,43 @@ def start_services(notes_root: str, wait_for_health: bool = True, timeout: int =
     compose_file = _get_compose_file()
     project_root = compose_file.parent
 
-    # Set environment variable for NOTES_ROOT
-    env = os.environ.copy()
-    env['NOTES_ROOT'] = notes_root
+    # Set NOTES_ROOT for docker compose, which inherits our environment
+    # (same approach as the serve and bridge commands)
+    os.environ['NOTES_ROOT'] = notes_root
+
+    up_command = ['docker', 'compose', '-f', str(compose_file), 'up', '-d']
+
+    # Let Compose block until the services are healthy, which replaces
+    # polling `docker compose ps` from here
+    if wait_for_health:
+        try:
+            subprocess.run(
+                up_command + ['--wait', '--wait-timeout', str(timeout)],
+                cwd=str(project_root),
+                # Only stderr is read; stdout is discarded undecoded
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True
+            )
+            return
+        except subprocess.CalledProcessError as e:
+            if 'unknown flag' not in (e.stderr or ''):
+                raise DockerComposeError(
+                    f"Services failed to start or health check did not pass within "
+                    f"{timeout} seconds: {e.stderr}"
+                )
+            # Compose releases without --wait; fall back to polling below
+        except FileNotFoundError:
+            raise DockerComposeError("docker or docker compose not found. Please install Docker.")
 
     # Start Docker Compose services in background
     try:
         result = subprocess.run(
-            ['docker', 'compose', '-f', str(compose_file), 'up', '-d'],
+            up_command,
             cwd=str(project_root),
-            env=env,
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             check=True
         )
@@ -70,9 +221,10 @@ def start_services(notes_root: str, wait_for_health: bool = True, timeout: int =
     except FileNotFoundError:
         raise DockerComposeError("docker or docker compose not found. Please install Docker.")
 
-    # Wait for health check if requested
-    if wait_for_health:
-        _wait_for_health(compose_file, project_root, timeout)
+    # Wait for health check if requested. mcp-server depends on memgraph
+    # being healthy, so `up` has usually waited already and says so.
+    if wait_for_health and not _up_reported_healthy(result.stderr):
+        _wait_for_health(timeout)
 
 
 def stop_services() -> None:
@@ -86,10 +238,11 @@ def stop_services() -> None:
 
     # Stop Docker Compose services
     try:
-        result = subprocess.run(
+        subprocess.run(
             ['docker', 'compose', '-f', str(compose_file), 'down'],
             cwd=str(project_root),
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             check=True
         )
@@ -126,13 +279,7 @@ def get_status() -> List[Dict[str, any]]:
             check=True
         )
 
-        # Parse the JSON output
-        services = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                services.append(json.loads(line))
-
-        return services
+        return _parse_ps_output(result.stdout)
 
     except subprocess.CalledProcessError as e:
         raise DockerComposeError(f"Failed to check service status: {e.stderr}")
@@ -151,76 +298,235 @@ def is_healthy() -> Tuple[bool, Optional[str]]:
         - message: Status message or error description
     """
     try:
-        services = get_status()
+        memgraph = _inspect_memgraph()
+    except subprocess.CalledProcessError as e:
+        return False, f"Failed to check service status: {e.stderr}"
+    except FileNotFoundError:
+        return False, "docker or docker compose not found. Please install Docker."
+
+    if memgraph is None:
+        return False, "Memgraph service not found"
 
-        if not services:
-            return False, "No services are running"
+    state, health = memgraph
 
-        # Check if memgraph is healthy
-        for service in services:
-            if 'memgraph' in service.get('Name', '') or 'memgraph' in service.get('Service', ''):
-                health = service.get('Health', '')
-                state = service.get('State', '')
+    if health == 'healthy':
+        return True, "Services are healthy"
+    elif state != 'running':
+        return False, f"Memgraph service is not running (state: {state})"
+    else:
+        return False, f"Memgraph service is running but not healthy (health: {health})"
 
-                if health == 'healthy':
-                    return True, "Services are healthy"
-                elif state != 'running':
-                    return False, f"Memgraph service is not running (state: {state})"
-                else:
-                    return False, f"Memgraph service is running but not healthy (health: {health})"
 
-        return False, "Memgraph service not found"
+def _inspect_memgraph() -> Optional[Tuple[str, str]]:
+    """Read Memgraph's container state and health.
 
-    except DockerComposeError as e:
-        return False, str(e)
+    Asks the Engine API over the unix socket DOCKER_HOST names, which
+    avoids a process launch per check, and otherwise runs `docker inspect`
+    (no Compose project load, a single word per field).
 
+    Any answer from the socket other than a parseable 200 defers to the
+    CLI, which also decides whether the container is missing.
+
+    Returns:
+        Tuple of (state, health), or None if the container does not exist
 
-def _wait_for_health(compose_file: Path, project_root: Path, timeout: int) -> None:
+    Raises:
+        subprocess.CalledProcessError: If `docker inspect` fails otherwise
+        FileNotFoundError: If docker is not installed
+    """
+    try:
+        status, body = _engine_get(f'/containers/{_MEMGRAPH_CONTAINER}/json')
+        if status == 200:
+            state = _loads(body).get('State') or {}
+            return state.get('Status', ''), (state.get('Health') or {}).get('Status', '')
+    except Exception:
+        pass
+
+    result = subprocess.run(
+        ['docker', 'inspect', '--format', _INSPECT_FORMAT, _MEMGRAPH_CONTAINER],
+        capture_output=True,
+        text=True
+    )
+
+    if result.returncode != 0:
+        if 'no such' in result.stderr.lower():
+            return None
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, result.stdout, result.stderr
+        )
+
+    state, _, health = result.stdout.strip().partition(' ')
+    return state, health
+
+
+def _wait_for_health(timeout: int) -> None:
     """Wait for services to become healthy.
 
+    Follows Memgraph's health_status events from `docker events` so the
+    wait ends as soon as the container turns healthy. Falls back to
+    polling if the event stream is unavailable. A container that exits
+    ends the wait early.
+
     Args:
-        compose_file: Path to docker-compose.yml
-        project_root: Path to project root directory
         timeout: Maximum time to wait in seconds
 
     Raises:
-        DockerComposeError: If timeout is reached before services become healthy
+        DockerComposeError: If timeout is reached before services become
+            healthy, or Memgraph exits first
+    """
+    deadline = time.monotonic() + timeout
+
+    healthy = _wait_for_cli_events(deadline)
+    if healthy is None:
+        # No usable event stream (older engine, Windows); poll instead
+        healthy = _poll_for_health(deadline)
+
+    if not healthy:
+        raise DockerComposeError(
+            f"Services started but health check did not pass within {timeout} seconds. "
+            "Run 'docker compose ps' to check service status manually."
+        )
+
+
+def _is_healthy_event(line: bytes) -> bool:
+    """Check whether a JSON event line reports Memgraph healthy.
+
+    Raises:
+        DockerComposeError: If the event reports that Memgraph exited
+    """
+    try:
+        # orjson.JSONDecodeError subclasses ValueError
+        event = _loads(line)
+    except ValueError:
+        return False
+
+    action = event.get('Action', event.get('status'))
+    if action == 'die':
+        raise _memgraph_exited()
+    return action == 'health_status: healthy'
+
+
+def _memgraph_exited() -> DockerComposeError:
+    """Build the error for a Memgraph container that stopped while waiting."""
+    return DockerComposeError(
+        "Memgraph exited before its health check passed. "
+        f"Run 'docker logs {_MEMGRAPH_CONTAINER}' to see why."
+    )
+
+
+def _already_healthy() -> bool:
+    """Catch a container that turned healthy before the event stream started."""
+    try:
+        return _memgraph_reported_healthy()
+    except subprocess.CalledProcessError:
+        return False
+
+
+def _wait_for_cli_events(deadline: float) -> Optional[bool]:
+    """Follow health_status events from a `docker events` process.
+
+    Returns:
+        True once healthy, False if the deadline passed first, or None if
+        the CLI is unavailable or the stream ended.
     """
-    max_attempts = timeout // 2  # Check every 2 seconds
-    attempt = 0
+    try:
+        events = subprocess.Popen(
+            ['docker', 'events',
+             '--filter', f'container={_MEMGRAPH_CONTAINER}',
+             '--filter', 'event=health_status',
+             '--filter', 'event=die',
+             '--format', '{{json .}}'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+
+    try:
+        if _already_healthy():
+            return True
+        return _read_health_events(events, deadline)
+    finally:
+        events.terminate()
+        events.wait()
+        events.stdout.close()
+
+
+def _read_health_events(events: subprocess.Popen, deadline: float) -> Optional[bool]:
+    """Read `docker events` JSON lines until Memgraph reports healthy.
+
+    Memgraph is also re-checked with `docker inspect` whenever the stream
+    has been quiet for a while, and once more at the deadline, in case it
+    turned healthy before the CLI subscribed.
+
+    Returns:
+        True once healthy, False if the deadline passed first, or None if
+        the event stream ended or cannot be waited on.
+    """
+    fd = events.stdout.fileno()
+    pending = b''
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _already_healthy()
 
-    while attempt < max_attempts:
         try:
-            result = subprocess.run(
-                ['docker', 'compose', '-f', str(compose_file), 'ps', '--format', 'json'],
-                cwd=str(project_root),
-                capture_output=True,
-                text=True,
-                check=True
+            readable, _, _ = select.select(
+                [fd], [], [], min(remaining, _EVENT_RECHECK_INTERVAL)
             )
+        except OSError:
+            # Pipes cannot be selected on Windows; let the caller poll
+            return None
+        if not readable:
+            if _already_healthy():
+                return True
+            continue
 
-            # Parse the JSON output to check service health
-            services = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    services.append(json.loads(line))
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            return None
 
-            # Check if memgraph is healthy (mcp-server depends on it)
-            for service in services:
-                if 'memgraph' in service.get('Name', '') or 'memgraph' in service.get('Service', ''):
-                    health = service.get('Health', '')
-                    if health == 'healthy':
-                        return  # Services are healthy
+        *lines, pending = (pending + chunk).split(b'\n')
+        if any(_is_healthy_event(line) for line in lines):
+            return True
 
-            time.sleep(2)
-            attempt += 1
 
-        except subprocess.CalledProcessError as e:
-            time.sleep(2)
-            attempt += 1
+def _memgraph_reported_healthy() -> bool:
+    """Check Memgraph's health once with `docker inspect`.
 
-    # Timeout reached
-    raise DockerComposeError(
-        f"Services started but health check did not pass within {timeout} seconds. "
-        "Run 'docker compose ps' to check service status manually."
-    )
+    Raises:
+        DockerComposeError: If the container has exited
+        subprocess.CalledProcessError: If `docker inspect` fails
+    """
+    memgraph = _inspect_memgraph()
+    if memgraph is None:
+        return False
+
+    state, health = memgraph
+    if state in ('exited', 'dead'):
+        raise _memgraph_exited()
+    return health == 'healthy'
+
+
+def _poll_for_health(deadline: float) -> bool:
+    """Poll `docker inspect` with backoff until healthy or the deadline.
+
+    Returns:
+        True if Memgraph became healthy before the deadline
+    """
+    delay = _POLL_INITIAL_DELAY
+
+    while True:
+        try:
+            if _memgraph_reported_healthy():
+                return True
+        except subprocess.CalledProcessError:
+            # Transient daemon hiccup; poll again soon
+            delay = _POLL_INITIAL_DELAY
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
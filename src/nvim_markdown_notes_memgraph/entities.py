@@ -10,13 +10,37 @@ from pathlib import Path
 from typing import Dict, List
 
 
+# Hashtags to exclude (common false positives). Compiled into the hashtag
+# regexes below at import, so changing it later has no effect.
+EXCLUDED_HASHTAGS = frozenset({'gid', 'browse', 'edit', 'resource'})
+
+# Rejects excluded hashtags inside the regex engine; the lookahead stops
+# '#gid' from excluding longer tags such as '#gid-notes'
+_NOT_EXCLUDED = r'(?!(?:%s)(?![a-zA-Z0-9_-]))' % '|'.join(
+    re.escape(tag) for tag in sorted(EXCLUDED_HASHTAGS))
+
+# Skips '#' after '/' or '=' (URL fragments, hex colours). The check sits
+# after the literal '#' so the regex engine can still jump to each '#'.
+_HASH = r'#(?<![/=]#)'
+
 # Regex patterns for entity extraction
 WIKILINK_PATTERN = re.compile(r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]')
 MENTION_PATTERN = re.compile(r'@([a-zA-Z][a-zA-Z0-9_-]*)')
-HASHTAG_PATTERN = re.compile(r'(?<![/=])#([a-zA-Z][a-zA-Z0-9_-]*)')
+HASHTAG_PATTERN = re.compile(_HASH + _NOT_EXCLUDED + r'([a-zA-Z][a-zA-Z0-9_-]*)')
+
+# All three patterns fused, for scanning a whole file in one pass. Wikilinks
+# may not span lines, matching the per-line functions.
+ENTITY_PATTERN = re.compile(
+    r'\[\[(?P<wikilink>[^\]|\n]+)(?:\|[^\]\n]+)?\]\]'
+    r'|@(?P<mention>[a-zA-Z][a-zA-Z0-9_-]*)'
+    r'|' + _HASH + _NOT_EXCLUDED + r'(?P<hashtag>[a-zA-Z][a-zA-Z0-9_-]*)'
+)
+
+# Markdown heading marker stripped from a note's first line to get its title
+HEADING_PREFIX_PATTERN = re.compile(r'^#+ ')
 
-# Hashtags to exclude (common false positives)
-EXCLUDED_HASHTAGS = {'gid', 'browse', 'edit', 'resource'}
+# Text following a mention that marks it as part of an email address
+EMAIL_SUFFIXES = ('@', '.com', '.co', '.org', '.io', '.nl', '.uk')
 
 
 def extract_wikilinks(line: str, line_num: int, notes_root: str) -> List[Dict]:
@@ -30,6 +54,9 @@ def extract_wikilinks(line: str, line_num: int, notes_root: str) -> List[Dict]:
     Returns:
         List of wikilink dictionaries with target, target_path, and line_number
     """
+    # Most lines have no link; a substring check is far cheaper than the regex
+    if '[[' not in line:
+        return []
     wikilinks = []
     for match in WIKILINK_PATTERN.finditer(line):
         link_text = match.group(1)
@@ -54,13 +81,13 @@ def extract_mentions(line: str, line_num: int) -> List[Dict]:
     Returns:
         List of mention dictionaries with name and line_number
     """
+    if '@' not in line:
+        return []
     mentions = []
     for match in MENTION_PATTERN.finditer(line):
         name = match.group(1)
-        end_pos = match.end()
-        rest_of_line = line[end_pos:]
-        # Skip if this is part of an email
-        if rest_of_line.startswith(('@', '.com', '.co', '.org', '.io', '.nl', '.uk')):
+        # Skip if this is part of an email (checked in place, no slice)
+        if line.startswith(EMAIL_SUFFIXES, match.end()):
             continue
         mentions.append({
             'name': name,
@@ -81,15 +108,80 @@ def extract_hashtags(line: str, line_num: int) -> List[Dict]:
     Returns:
         List of hashtag dictionaries with name and line_number
     """
+    if '#' not in line:
+        return []
     hashtags = []
     for match in HASHTAG_PATTERN.finditer(line):
-        tag = match.group(1)
-        if tag not in EXCLUDED_HASHTAGS:
-            hashtags.append({
-                'name': tag,
+        hashtags.append({
+            'name': match.group(1),
+            'line_number': line_num
+        })
+    return hashtags
+
+
+def extract_from_content(content: str, notes_root: str) -> Dict[str, List[Dict]]:
+    """Extract all entities from note content in a single regex pass.
+
+    Produces the same results as calling extract_wikilinks, extract_mentions
+    and extract_hashtags on every line, without the per-line overhead.
+
+    Args:
+        content: Full note content
+        notes_root: Root directory for notes
+
+    Returns:
+        Dictionary with wikilinks, mentions, and hashtags lists
+    """
+    wikilinks = []
+    mentions = []
+    hashtags = []
+
+    line_num = 1
+    line_pos = 0
+
+    # Equivalent to os.path.join(notes_root, link_text + '.md') for relative
+    # link text, without the per-link call ('' stays '', no doubled sep)
+    prefix = os.path.join(notes_root, '')
+
+    def add_mention(match, name):
+        # Skip if this is part of an email
+        if not content.startswith(EMAIL_SUFFIXES, match.end()):
+            mentions.append({'name': name, 'line_number': line_num})
+
+    for match in ENTITY_PATTERN.finditer(content):
+        start = match.start()
+        line_num += content.count('\n', line_pos, start)
+        line_pos = start
+
+        kind = match.lastgroup
+        if kind == 'wikilink':
+            link_text = match.group('wikilink')
+            if link_text.startswith(('/', os.sep)):
+                target_path = os.path.join(notes_root, link_text + '.md')
+            else:
+                target_path = prefix + link_text + '.md'
+            wikilinks.append({
+                'target': link_text,
+                'target_path': target_path,
                 'line_number': line_num
             })
-    return hashtags
+            # The per-line patterns also find mentions and hashtags inside
+            # a wikilink, which the fused scan has consumed
+            end = match.end()
+            for inner in MENTION_PATTERN.finditer(content, start, end):
+                add_mention(inner, inner.group(1))
+            for inner in HASHTAG_PATTERN.finditer(content, start, end):
+                hashtags.append({'name': inner.group(1), 'line_number': line_num})
+        elif kind == 'mention':
+            add_mention(match, match.group('mention'))
+        else:
+            hashtags.append({'name': match.group('hashtag'), 'line_number': line_num})
+
+    return {
+        'wikilinks': wikilinks,
+        'mentions': mentions,
+        'hashtags': hashtags
+    }
 
 
 def extract_from_file(filepath: str, notes_root: str = None) -> Dict:
@@ -118,24 +210,12 @@ def extract_from_file(filepath: str, notes_root: str = None) -> Dict:
             'hashtags': []
         }
 
-    lines = content.split('\n')
-    title = lines[0] if lines else Path(filepath).stem
-    title = re.sub(r'^#+ ', '', title)  # Remove heading prefix
-
-    wikilinks = []
-    mentions = []
-    hashtags = []
-
-    for line_num, line in enumerate(lines, 1):
-        wikilinks.extend(extract_wikilinks(line, line_num, notes_root))
-        mentions.extend(extract_mentions(line, line_num))
-        hashtags.extend(extract_hashtags(line, line_num))
+    title = content.partition('\n')[0]
+    title = HEADING_PREFIX_PATTERN.sub('', title)  # Remove heading prefix
 
     return {
         'path': filepath,
         'title': title,
         'content': content,
-        'wikilinks': wikilinks,
-        'mentions': mentions,
-        'hashtags': hashtags
+        **extract_from_content(content, notes_root)
     }
@@ -16,12 +16,20 @@ Environment variables:
 """
 
 import asyncio
+import base64
+import functools
+import hashlib
+import itertools
 import json
 import os
-import re
+import subprocess
 import sys
-import glob
-from typing import Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Iterator, Optional
 from pathlib import Path
 
 # Package imports
@@ -34,8 +42,11 @@ try:
     from mcp.types import (
         Tool,
         TextContent,
+        ListResourcesRequest,
+        ListResourcesResult,
         Resource,
         ResourceTemplate,
+        ServerResult,
     )
     HAS_MCP = True
 except ImportError:
@@ -49,13 +60,232 @@ try:
 except ImportError:
     HAS_MGCLIENT = False
 
+# orjson is optional; it serializes large tool results much faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Notes written per transaction during a reindex
+REINDEX_BATCH_SIZE = 500
+
+# Files modified this recently are not trusted by mtime alone on the next
+# reindex: a second write within the filesystem's timestamp granularity
+# could leave the mtime unchanged
+MTIME_RACY_WINDOW_NS = 2_000_000_000
+
+# Full-text search limits: files returned, and matching lines per file
+SEARCH_MAX_RESULTS = 20
+SEARCH_MAX_MATCHES = 3
+
+
+# Read results are cached briefly. The Neovim bridge writes to the graph
+# from another process and cannot invalidate this cache, so entries must
+# expire quickly.
+QUERY_CACHE_TTL = 10.0
+QUERY_CACHE_SIZE = 256
+
+# Notes are exposed as MCP resources under this URI scheme, listed a page
+# at a time
+NOTE_URI_PREFIX = "note://"
+RESOURCES_PAGE_SIZE = 50
+
+# MCP tool calls run on this many worker threads, each with its own
+# Memgraph connection, so concurrent calls do not queue on one socket
+CONNECTION_POOL_SIZE = 4
+
+# Tool and dependency directories never walked for notes. Hidden
+# directories such as .git and .venv are skipped anyway.
+IGNORED_DIRS = frozenset({'node_modules', 'venv', '__pycache__'})
+
+# Write queries used when indexing files from disk
+
+INDEXED_HASHES = """
+    MATCH (n:Note)
+    WHERE n.content_hash IS NOT NULL
+    RETURN n.path, n.content_hash, n.mtime_ns
+"""
+
+# Lowercased copies of title and filename let case-insensitive searches
+# compare stored values instead of calling toLower on every note
+MERGE_NOTE = """
+    MERGE (n:Note {path: $path})
+    SET n.title = $title,
+        n.title_lower = toLower($title),
+        n.filename = $filename,
+        n.filename_lower = toLower($filename),
+        n.content_hash = $content_hash,
+        n.mtime_ns = $mtime_ns,
+        n.last_modified = $last_modified
+"""
+
+# Same, for a note indexed before: also drop its outgoing relationships
+REPLACE_NOTE = MERGE_NOTE + """
+    WITH n
+    OPTIONAL MATCH (n)-[r:LINKS_TO|MENTIONS|HAS_TAG]->()
+    WITH n, collect(r) AS rels
+    FOREACH (r IN rels | DELETE r)
+"""
+
+LINK_UNWIND = """
+    MATCH (source:Note {path: $source_path})
+    UNWIND $rows AS row
+    MERGE (target:Note {path: row.target_path})
+    MERGE (source)-[r:LINKS_TO {line_number: row.line_number}]->(target)
+"""
+
+MENTION_UNWIND = """
+    MATCH (source:Note {path: $source_path})
+    UNWIND $rows AS row
+    MERGE (person:Person {name: row.name})
+    MERGE (source)-[r:MENTIONS {line_number: row.line_number}]->(person)
+"""
+
+TAG_UNWIND = """
+    MATCH (source:Note {path: $source_path})
+    UNWIND $rows AS row
+    MERGE (tag:Tag {name: row.name})
+    MERGE (source)-[r:HAS_TAG {line_number: row.line_number}]->(tag)
+"""
+
+PERSON_NOTE = """
+    MERGE (person:Person {name: $person_name})
+    SET person.display_name = $person_name
+    WITH person
+    MATCH (note:Note {path: $path})
+    MERGE (person)-[:HAS_NOTE]->(note)
+"""
+
+REMOVE_NOTES = """
+    UNWIND $paths AS path
+    MATCH (n:Note {path: path})
+    OPTIONAL MATCH (n)-[r:LINKS_TO|MENTIONS|HAS_TAG]->()
+    WITH n, collect(r) AS rels
+    OPTIONAL MATCH (n)<-[h:HAS_NOTE]-()
+    WITH n, rels + collect(h) AS rels
+    FOREACH (r IN rels | DELETE r)
+    REMOVE n.title, n.title_lower, n.filename, n.filename_lower,
+           n.content_hash, n.mtime_ns, n.last_modified
+"""
+
+# Record the mtime of files whose content turned out to be unchanged
+SET_MTIMES = """
+    UNWIND $rows AS row
+    MATCH (n:Note {path: row.path})
+    SET n.mtime_ns = row.mtime_ns
+"""
+
+DELETE_ORPHAN_NOTES = """
+    MATCH (n:Note)
+    WHERE n.content_hash IS NULL AND NOT (n)<-[:LINKS_TO]-()
+    DELETE n
+"""
+
+DELETE_ORPHAN_TAGS = """
+    MATCH (t:Tag)
+    WHERE NOT (t)<-[:HAS_TAG]-()
+    DELETE t
+"""
+
+DELETE_ORPHAN_PERSONS = """
+    MATCH (p:Person)
+    WHERE NOT (p)<-[:MENTIONS]-() AND NOT (p)-[:HAS_NOTE]->()
+    DELETE p
+"""
+
+
+def _to_json(obj: Any) -> str:
+    """Serialize a tool result as indented JSON."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _content_hash(content: str) -> str:
+    """Fingerprint note content; must match the bridge's content hash."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _cached_read(method):
+    """Serve repeated identical calls of a read method from the query cache.
+
+    Cached results are shared between callers and must not be mutated.
+    A result is not stored if the cache was cleared while its query ran,
+    since it may predate the write that cleared it.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                self._cache_hits += 1
+                return entry[1]
+            self._cache_misses += 1
+            generation = self._cache_generation
+
+        # Run the query outside the lock so other threads are not blocked
+        result = method(self, *args, **kwargs)
+        with self._cache_lock:
+            if generation != self._cache_generation:
+                return result
+            self._cache[key] = (now + QUERY_CACHE_TTL, result)
+            self._cache.move_to_end(key)
+            if len(self._cache) > QUERY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    return wrapper
+
 
 class MemgraphNotesServer:
     def __init__(self, host: str = "localhost", port: int = 7687, notes_root: str = None):
         self.host = host
         self.port = port
         self.notes_root = notes_root or os.getcwd()
-        self.connection: Optional[Any] = None
+        self._local = threading.local()
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Bumped by clear_cache() so reads that overlap a write are not cached
+        self._cache_generation = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Tool calls run on several threads, each on its own connection;
+        # graph rewrites take this lock so they never interleave
+        self._reindex_lock = threading.Lock()
+
+    @property
+    def connection(self) -> Optional[Any]:
+        """The calling thread's Memgraph connection.
+
+        mgclient connections run one query at a time, so each thread that
+        queries the graph connects on its own.
+        """
+        return getattr(self._local, 'connection', None)
+
+    @connection.setter
+    def connection(self, value: Optional[Any]):
+        self._local.connection = value
+
+    def clear_cache(self):
+        """Drop cached read results, e.g. after writing to the graph."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_generation += 1
+
+    def cache_stats(self) -> dict:
+        """Report query cache size and hit counts."""
+        return {
+            "size": len(self._cache),
+            "max_size": QUERY_CACHE_SIZE,
+            "ttl_seconds": QUERY_CACHE_TTL,
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+        }
 
     def connect(self) -> bool:
         """Connect to Memgraph database."""
@@ -71,7 +301,7 @@ class MemgraphNotesServer:
             return False
 
     def is_connected(self) -> bool:
-        """Check if connected to Memgraph."""
+        """Check if connected to Memgraph with a round trip to the server."""
         if not self.connection:
             return False
         try:
@@ -84,19 +314,48 @@ class MemgraphNotesServer:
             return False
 
     def ensure_connected(self) -> bool:
-        """Ensure connection is alive, reconnect if needed."""
-        if not self.is_connected():
+        """Connect if there is no connection yet.
+
+        The connection is not probed; query() notices a dropped connection
+        when a query fails and reconnects then.
+        """
+        if self.connection is None:
             return self.connect()
         return True
 
-    def query(self, cypher: str, params: dict = None) -> list:
-        """Execute a Cypher query and return results."""
+    def _connection_lost(self) -> bool:
+        """Check whether the connection is unusable after a failed query."""
+        return self.connection.status in (mgclient.CONN_STATUS_BAD, mgclient.CONN_STATUS_CLOSED)
+
+    def query(self, cypher: str, params: dict = None, raw: bool = False) -> list:
+        """Execute a Cypher query and return results.
+
+        Nodes and relationships in the results are converted to property
+        dicts. Queries that only return plain values can pass raw=True to
+        get the driver's rows as they are, skipping that per-value pass.
+
+        If the query fails because the connection dropped, reconnect and
+        retry it once. Other errors are raised as they are.
+        """
         if not self.ensure_connected():
             raise Exception("Not connected to Memgraph")
+        try:
+            return self._execute(cypher, params, raw)
+        except Exception:
+            if not self._connection_lost():
+                raise
+        self.connection = None
+        if not self.connect():
+            raise Exception("Not connected to Memgraph")
+        return self._execute(cypher, params, raw)
 
+    def _execute(self, cypher: str, params: dict = None, raw: bool = False) -> list:
+        """Execute a Cypher query on the current connection without probing it."""
         cursor = self.connection.cursor()
         cursor.execute(cypher, params or {})
         rows = cursor.fetchall()
+        if raw:
+            return rows
 
         # Convert to serializable format
         results = []
@@ -110,6 +369,7 @@ class MemgraphNotesServer:
             results.append(row_data)
         return results
 
+    @_cached_read
     def get_backlinks(self, note_path: str) -> list[dict]:
         """Find notes that link to a given note."""
         cypher = """
@@ -117,9 +377,10 @@ class MemgraphNotesServer:
             RETURN source.path AS path, source.title AS title, r.line_number AS line
             ORDER BY source.title
         """
-        results = self.query(cypher, {"path": note_path})
+        results = self.query(cypher, {"path": note_path}, raw=True)
         return [{"path": r[0], "title": r[1], "line": r[2]} for r in results]
 
+    @_cached_read
     def get_related(self, note_path: str) -> list[dict]:
         """Find notes related to a given note (sharing tags/mentions)."""
         cypher = """
@@ -131,26 +392,32 @@ class MemgraphNotesServer:
             ORDER BY shared_count DESC
             LIMIT 20
         """
-        results = self.query(cypher, {"path": note_path})
+        results = self.query(cypher, {"path": note_path}, raw=True)
         return [{"path": r[0], "title": r[1], "shared_count": r[2], "connections": r[3]} for r in results]
 
+    @_cached_read
     def get_note_context(self, note_path: str) -> dict:
         """Get full context for a note including all relationships."""
+        # Collect each relationship type before matching the next, so the
+        # rows never multiply into links x tags x mentions x backlinks
         cypher = """
             MATCH (note:Note {path: $path})
             OPTIONAL MATCH (note)-[:LINKS_TO]->(linked:Note)
+            WITH note, collect(DISTINCT {path: linked.path, title: linked.title}) AS outgoing_links
             OPTIONAL MATCH (note)-[:HAS_TAG]->(tag:Tag)
+            WITH note, outgoing_links, collect(DISTINCT tag.name) AS tags
             OPTIONAL MATCH (note)-[:MENTIONS]->(person:Person)
+            WITH note, outgoing_links, tags, collect(DISTINCT person.name) AS mentions
             OPTIONAL MATCH (backlink:Note)-[:LINKS_TO]->(note)
             RETURN
                 note.title AS title,
                 note.path AS path,
-                collect(DISTINCT {path: linked.path, title: linked.title}) AS outgoing_links,
-                collect(DISTINCT tag.name) AS tags,
-                collect(DISTINCT person.name) AS mentions,
+                outgoing_links,
+                tags,
+                mentions,
                 collect(DISTINCT {path: backlink.path, title: backlink.title}) AS backlinks
         """
-        results = self.query(cypher, {"path": note_path})
+        results = self.query(cypher, {"path": note_path}, raw=True)
         if not results:
             return {"error": "Note not found"}
 
@@ -174,31 +441,37 @@ class MemgraphNotesServer:
             ORDER BY n.title
             LIMIT 20
         """
-        results = self.query(cypher, {"query": query})
+        results = self.query(cypher, {"query": query}, raw=True)
         return [{"path": r[0], "title": r[1]} for r in results]
 
+    @_cached_read
     def find_by_tag(self, tag: str) -> list[dict]:
         """Find notes with a specific tag."""
         tag = tag.lstrip("#")
+        # Start from the indexed tag rather than scanning notes
         cypher = """
+            USING INDEX :Tag(name)
             MATCH (note:Note)-[r:HAS_TAG]->(t:Tag {name: $tag})
             RETURN note.path AS path, note.title AS title, r.line_number AS line
             ORDER BY note.title
         """
-        results = self.query(cypher, {"tag": tag})
+        results = self.query(cypher, {"tag": tag}, raw=True)
         return [{"path": r[0], "title": r[1], "line": r[2]} for r in results]
 
+    @_cached_read
     def find_by_mention(self, person: str) -> list[dict]:
         """Find notes mentioning a specific person."""
         person = person.lstrip("@")
         cypher = """
+            USING INDEX :Person(name)
             MATCH (note:Note)-[r:MENTIONS]->(p:Person {name: $person})
             RETURN note.path AS path, note.title AS title, r.line_number AS line
             ORDER BY note.title
         """
-        results = self.query(cypher, {"person": person})
+        results = self.query(cypher, {"person": person}, raw=True)
         return [{"path": r[0], "title": r[1], "line": r[2]} for r in results]
 
+    @_cached_read
     def get_all_tags(self) -> list[dict]:
         """Get all tags with usage counts."""
         cypher = """
@@ -206,9 +479,10 @@ class MemgraphNotesServer:
             RETURN t.name AS name, count(r) AS count
             ORDER BY count DESC
         """
-        results = self.query(cypher, {})
+        results = self.query(cypher, {}, raw=True)
         return [{"name": r[0], "count": r[1]} for r in results]
 
+    @_cached_read
     def get_all_persons(self) -> list[dict]:
         """Get all mentioned persons."""
         cypher = """
@@ -217,30 +491,39 @@ class MemgraphNotesServer:
             RETURN p.name AS name, count(r) AS mention_count
             ORDER BY mention_count DESC
         """
-        results = self.query(cypher, {})
+        results = self.query(cypher, {}, raw=True)
         return [{"name": r[0], "mention_count": r[1]} for r in results]
 
+    @_cached_read
     def get_graph_stats(self) -> dict:
         """Get statistics about the graph."""
-        stats = {}
-
-        queries = [
-            ("notes", "MATCH (n:Note) RETURN count(n)"),
-            ("tags", "MATCH (t:Tag) RETURN count(t)"),
-            ("persons", "MATCH (p:Person) RETURN count(p)"),
-            ("links", "MATCH ()-[r:LINKS_TO]->() RETURN count(r)"),
-            ("mentions", "MATCH ()-[r:MENTIONS]->() RETURN count(r)"),
-            ("tag_usages", "MATCH ()-[r:HAS_TAG]->() RETURN count(r)"),
-        ]
+        keys = ("notes", "tags", "persons", "links", "mentions", "tag_usages")
 
-        for name, cypher in queries:
-            try:
-                result = self.query(cypher)
-                stats[name] = result[0][0] if result else 0
-            except Exception:
-                stats[name] = 0
+        # All counts in one round-trip. OPTIONAL MATCH keeps the row alive
+        # when a label or relationship type has no entries.
+        cypher = """
+            OPTIONAL MATCH (n:Note)
+            WITH count(n) AS notes
+            OPTIONAL MATCH (t:Tag)
+            WITH notes, count(t) AS tags
+            OPTIONAL MATCH (p:Person)
+            WITH notes, tags, count(p) AS persons
+            OPTIONAL MATCH ()-[l:LINKS_TO]->()
+            WITH notes, tags, persons, count(l) AS links
+            OPTIONAL MATCH ()-[m:MENTIONS]->()
+            WITH notes, tags, persons, links, count(m) AS mentions
+            OPTIONAL MATCH ()-[h:HAS_TAG]->()
+            RETURN notes, tags, persons, links, mentions, count(h) AS tag_usages
+        """
 
-        return stats
+        try:
+            result = self.query(cypher, raw=True)
+        except Exception:
+            return dict.fromkeys(keys, 0)
+
+        if not result:
+            return dict.fromkeys(keys, 0)
+        return dict(zip(keys, result[0]))
 
     def read_note_content(self, note_path: str) -> str:
         """Read the content of a note file."""
@@ -249,8 +532,10 @@ class MemgraphNotesServer:
             if not path.is_absolute():
                 path = Path(self.notes_root) / note_path
 
-            if path.exists():
-                return path.read_text()
+            # Read directly rather than checking exists() first: one less
+            # stat, and no window for the file to vanish in between
+            return path.read_text()
+        except FileNotFoundError:
             return f"Note not found: {note_path}"
         except Exception as e:
             return f"Error reading note: {e}"
@@ -259,13 +544,57 @@ class MemgraphNotesServer:
         """Extract wikilinks, mentions, and hashtags from a markdown file."""
         return entities.extract_from_file(filepath, self.notes_root)
 
-    def reindex_all_notes(self) -> dict:
-        """Reindex all notes in the notes_root directory."""
-        # Find all markdown files
-        md_files = glob.glob(os.path.join(self.notes_root, '**/*.md'), recursive=True)
+    def reindex_all_notes(self, full: bool = False) -> dict:
+        """Reindex all notes in the notes_root directory.
 
-        # Clear the graph
-        self.query("MATCH (n) DETACH DELETE n")
+        By default only notes whose content hash changed are rewritten, and
+        notes whose files are gone are removed. Files whose mtime matches the
+        one recorded when they were indexed are not read at all. With
+        full=True the graph is cleared and rebuilt from scratch.
+
+        Reindexes run one at a time. The query cache is cleared once the
+        writes are done, whether or not the reindex succeeded.
+        """
+        with self._reindex_lock:
+            try:
+                return self._reindex(full)
+            finally:
+                self.clear_cache()
+
+    def _reindex(self, full: bool) -> dict:
+        """Reindex the notes; the caller holds _reindex_lock."""
+        # Find all markdown files
+        md_files = list(_iter_markdown_files(self.notes_root))
+
+        if full:
+            # Clear the graph
+            self.query("MATCH (n) DETACH DELETE n")
+            indexed_notes = {}
+        else:
+            # Link targets without a file of their own have no hash
+            indexed_notes = {
+                path: (content_hash, mtime_ns)
+                for path, content_hash, mtime_ns in self.query(INDEXED_HASHES, raw=True)
+            }
+
+        # Only read files modified since they were indexed
+        unchanged = 0
+        mtimes = {}
+        to_read = []
+        now_ns = time.time_ns()
+        for path in md_files:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            previous = indexed_notes.get(path)
+            if mtime_ns is not None and previous is not None and previous[1] == mtime_ns:
+                del indexed_notes[path]
+                unchanged += 1
+                continue
+            if mtime_ns is not None and now_ns - mtime_ns > MTIME_RACY_WINDOW_NS:
+                mtimes[path] = mtime_ns
+            to_read.append(path)
 
         # Create indexes
         index_queries = [
@@ -280,29 +609,117 @@ class MemgraphNotesServer:
             except Exception:
                 pass  # Index might already exist
 
-        # Extract and index each file
+        # Extract and index each file. The queries above have already
+        # checked the connection; write the notes in explicit transactions
+        # so each batch pays for one commit instead of one per statement.
         indexed = 0
         errors = []
-
-        for filepath in md_files:
-            try:
-                note = self.extract_from_file(filepath)
-                self._index_note(note)
-                indexed += 1
-            except Exception as e:
-                errors.append({"path": filepath, "error": str(e)})
+        batch = []
+        touched = []
+        self.connection.autocommit = False
+        try:
+            for filepath in to_read:
+                note = entities.extract_from_file(filepath, self.notes_root)
+                content_hash = _content_hash(note['content'])
+                mtime_ns = mtimes.get(note['path'])
+                previous = indexed_notes.pop(note['path'], None)
+                if previous is not None and previous[0] == content_hash:
+                    unchanged += 1
+                    if mtime_ns is not None:
+                        touched.append({"path": note['path'], "mtime_ns": mtime_ns})
+                    continue
+
+                note['mtime_ns'] = mtime_ns
+                batch.append((note, content_hash, previous is not None))
+                if len(batch) >= REINDEX_BATCH_SIZE:
+                    indexed += self._index_batch(batch, errors)
+                    batch = []
+            if batch:
+                indexed += self._index_batch(batch, errors)
+        finally:
+            self._restore_autocommit()
+
+        if touched:
+            self.query(SET_MTIMES, {"rows": touched})
+
+        # Whatever is left was indexed from a file that no longer exists
+        removed = list(indexed_notes)
+        if removed:
+            self._remove_notes(removed)
+        if indexed or removed:
+            self._delete_orphans()
 
         return {
             "indexed": indexed,
+            "unchanged": unchanged,
+            "removed": len(removed),
             "total": len(md_files),
             "errors": errors
         }
 
-    def _index_note(self, note: dict):
-        """Index a single note into the graph."""
-        import hashlib
-        from datetime import datetime
+    def _restore_autocommit(self):
+        """Switch the connection back to autocommit after explicit transactions.
+
+        pymgclient refuses while a transaction is still open or once the
+        connection has gone bad, e.g. after a failed rollback. The
+        connection is then dropped so the next query() reconnects, and
+        the error that ended the reindex is not masked.
+        """
+        try:
+            self.connection.autocommit = True
+        except Exception:
+            self.connection = None
+
+    def _index_batch(self, batch: list[tuple], errors: list[dict]) -> int:
+        """Index notes in one transaction and return how many were written.
 
+        batch holds (note, content_hash, replace) tuples. If the batch
+        fails, it is rolled back and retried one note per transaction, so a
+        bad note is reported in errors without losing the rest of the batch.
+        """
+        try:
+            for note, content_hash, replace in batch:
+                self._index_note(note, content_hash, replace)
+            self.connection.commit()
+            return len(batch)
+        except Exception:
+            self.connection.rollback()
+
+        indexed = 0
+        for note, content_hash, replace in batch:
+            try:
+                self._index_note(note, content_hash, replace)
+                self.connection.commit()
+                indexed += 1
+            except Exception as e:
+                self.connection.rollback()
+                errors.append({"path": note['path'], "error": str(e)})
+        return indexed
+
+    def _remove_notes(self, paths: list[str]):
+        """Turn notes whose files were deleted back into plain link targets.
+
+        Their relationships and properties are dropped; notes that nothing
+        links to any more are deleted by _delete_orphans.
+        """
+        self.query(REMOVE_NOTES, {"paths": paths})
+
+    def _delete_orphans(self):
+        """Delete nodes a full rebuild would not recreate.
+
+        That is link targets nothing links to, tags nothing uses, and
+        persons that are neither mentioned nor have a note.
+        """
+        self.query(DELETE_ORPHAN_NOTES)
+        self.query(DELETE_ORPHAN_TAGS)
+        self.query(DELETE_ORPHAN_PERSONS)
+
+    def _index_note(self, note: dict, content_hash: str = None, replace: bool = False):
+        """Index a single note into the graph on the current connection.
+
+        With replace=True the note's existing outgoing relationships are
+        dropped first, for notes that were indexed before.
+        """
         path = note['path']
         title = note['title']
         content = note['content']
@@ -311,79 +728,47 @@ class MemgraphNotesServer:
         hashtags = note.get('hashtags', [])
 
         filename = os.path.basename(path)
-        content_hash = hashlib.md5(content.encode()).hexdigest()
+        if content_hash is None:
+            content_hash = _content_hash(content)
         last_modified = datetime.now().isoformat()
 
         # Create/update note node
-        self.query("""
-            MERGE (n:Note {path: $path})
-            SET n.title = $title,
-                n.filename = $filename,
-                n.content_hash = $content_hash,
-                n.last_modified = $last_modified
-        """, {
+        self._execute(REPLACE_NOTE if replace else MERGE_NOTE, {
             "path": path,
             "title": title,
             "filename": filename,
             "content_hash": content_hash,
+            "mtime_ns": note.get('mtime_ns'),
             "last_modified": last_modified
         })
 
-        # Create wikilink relationships
-        for link in wikilinks:
-            target_path = link.get('target_path')
-            line_number = link.get('line_number', 0)
-            if target_path:
-                self.query("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (target:Note {path: $target_path})
-                    MERGE (source)-[r:LINKS_TO {line_number: $line_number}]->(target)
-                """, {
-                    "source_path": path,
-                    "target_path": target_path,
-                    "line_number": line_number
-                })
+        # Create relationships with one UNWIND query per type, so a note
+        # costs a fixed number of round-trips however many entities it has
+        link_rows = [
+            {"target_path": link['target_path'], "line_number": link.get('line_number', 0)}
+            for link in wikilinks if link.get('target_path')
+        ]
+        if link_rows:
+            self._execute(LINK_UNWIND, {"source_path": path, "rows": link_rows})
 
-        # Create mention relationships
-        for mention in mentions:
-            person_name = mention.get('name')
-            line_number = mention.get('line_number', 0)
-            if person_name:
-                self.query("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (person:Person {name: $person_name})
-                    MERGE (source)-[r:MENTIONS {line_number: $line_number}]->(person)
-                """, {
-                    "source_path": path,
-                    "person_name": person_name,
-                    "line_number": line_number
-                })
+        mention_rows = [
+            {"name": mention['name'], "line_number": mention.get('line_number', 0)}
+            for mention in mentions if mention.get('name')
+        ]
+        if mention_rows:
+            self._execute(MENTION_UNWIND, {"source_path": path, "rows": mention_rows})
 
-        # Create hashtag relationships
-        for tag in hashtags:
-            tag_name = tag.get('name')
-            line_number = tag.get('line_number', 0)
-            if tag_name:
-                self.query("""
-                    MATCH (source:Note {path: $source_path})
-                    MERGE (tag:Tag {name: $tag_name})
-                    MERGE (source)-[r:HAS_TAG {line_number: $line_number}]->(tag)
-                """, {
-                    "source_path": path,
-                    "tag_name": tag_name,
-                    "line_number": line_number
-                })
+        tag_rows = [
+            {"name": tag['name'], "line_number": tag.get('line_number', 0)}
+            for tag in hashtags if tag.get('name')
+        ]
+        if tag_rows:
+            self._execute(TAG_UNWIND, {"source_path": path, "rows": tag_rows})
 
         # Check if this is a person note (in people directory)
         if "/people/" in path:
             person_name = os.path.splitext(filename)[0]
-            self.query("""
-                MERGE (person:Person {name: $person_name})
-                SET person.display_name = $person_name
-                WITH person
-                MATCH (note:Note {path: $path})
-                MERGE (person)-[:HAS_NOTE]->(note)
-            """, {
+            self._execute(PERSON_NOTE, {
                 "person_name": person_name,
                 "path": path
             })
@@ -398,8 +783,10 @@ class MemgraphNotesServer:
         if end_date is None:
             end_date = start_date
 
-        # Search for journal entries and date-prefixed notes
+        # Search for journal entries and date-prefixed notes. The filename
+        # bounds are a range scan on the :Note(filename) index.
         cypher = """
+            USING INDEX :Note(filename)
             MATCH (n:Note)
             WHERE (n.path CONTAINS '/journal/' OR n.filename STARTS WITH '20')
             AND (
@@ -409,52 +796,119 @@ class MemgraphNotesServer:
             RETURN n.path AS path, n.title AS title, n.filename AS filename
             ORDER BY n.filename DESC
         """
-        results = self.query(cypher, {"start_date": start_date, "end_date": end_date})
+        results = self.query(cypher, {"start_date": start_date, "end_date": end_date}, raw=True)
         return [{"path": r[0], "title": r[1], "filename": r[2]} for r in results]
 
     def find_notes_by_filename_pattern(self, pattern: str) -> list[dict]:
         """Find notes where filename contains the pattern."""
+        # Notes written before the lowercased properties existed fall back
+        # to toLower; coalesce only evaluates it when the property is missing
         cypher = """
+            WITH toLower($pattern) AS pattern
             MATCH (n:Note)
-            WHERE toLower(n.filename) CONTAINS toLower($pattern)
-               OR toLower(n.title) CONTAINS toLower($pattern)
+            WHERE coalesce(n.filename_lower, toLower(n.filename)) CONTAINS pattern
+               OR coalesce(n.title_lower, toLower(n.title)) CONTAINS pattern
             RETURN n.path AS path, n.title AS title, n.filename AS filename
             ORDER BY n.filename DESC
             LIMIT 50
         """
-        results = self.query(cypher, {"pattern": pattern})
+        results = self.query(cypher, {"pattern": pattern}, raw=True)
         return [{"path": r[0], "title": r[1], "filename": r[2]} for r in results]
 
     def search_note_content(self, query: str) -> list[dict]:
         """Full-text search in note content. Use this as a LAST RESORT."""
-        # Read files and search content since Memgraph doesn't store full content
+        # Search files since Memgraph doesn't store full content. ripgrep
+        # is much faster on large vaults; scan in Python when it is missing.
+        results = self._search_with_ripgrep(query)
+        if results is None:
+            results = self._search_with_python(query)
+        return results
+
+    def _search_with_ripgrep(self, query: str) -> Optional[list[dict]]:
+        """Case-insensitive literal search with `rg --json`.
+
+        Flags mirror the Python scan: every *.md file under notes_root
+        outside IGNORED_DIRS, following symlinks, ignoring .gitignore and
+        skipping hidden files.
+
+        Returns:
+            Search results, or None if ripgrep is unavailable or failed
+        """
+        if '\n' in query:
+            # ripgrep matches single lines only
+            return None
+
+        globs = ['--glob', '*.md']
+        for name in sorted(IGNORED_DIRS):
+            globs += ['--glob', f'!{name}/']
+        try:
+            proc = subprocess.Popen(
+                ['rg', '--json', '--ignore-case', '--fixed-strings',
+                 '--max-count', str(SEARCH_MAX_MATCHES),
+                 '--no-ignore', '--follow', *globs,
+                 '--', query, self.notes_root],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+
         results = []
-        md_files = glob.glob(os.path.join(self.notes_root, '**/*.md'), recursive=True)
+        by_path = {}
+        stopped = False
+        try:
+            for line in proc.stdout:
+                event = json.loads(line)
+                if event.get('type') != 'match':
+                    continue
+                data = event['data']
+                filepath = _rg_text(data['path'])
+
+                result = by_path.get(filepath)
+                if result is None:
+                    if len(results) >= SEARCH_MAX_RESULTS:
+                        stopped = True
+                        break
+                    result = by_path[filepath] = {
+                        "path": filepath,
+                        "title": _read_title(filepath),
+                        "matches": []
+                    }
+                    results.append(result)
+                result["matches"].append({
+                    "line": data['line_number'],
+                    "text": _rg_text(data['lines']).strip()[:100]
+                })
+        finally:
+            if stopped:
+                proc.kill()
+            proc.wait()
+            proc.stdout.close()
+
+        # 1 means no matches; 2 means an error, which is only fatal if
+        # nothing was found (unreadable files also exit with 2)
+        if proc.returncode == 2 and not results:
+            return None
+        return results
 
+    def _search_with_python(self, query: str) -> list[dict]:
+        """Case-insensitive substring search by reading every note."""
+        results = []
         query_lower = query.lower()
-        for filepath in md_files:
+        # Walk lazily so the scan stops once SEARCH_MAX_RESULTS are found
+        for filepath in _iter_markdown_files(self.notes_root):
             try:
                 with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
-                if query_lower in content.lower():
-                    lines = content.split('\n')
-                    title = lines[0] if lines else Path(filepath).stem
-                    title = re.sub(r'^#+ ', '', title)
-
-                    # Find matching lines
-                    matching_lines = []
-                    for i, line in enumerate(lines, 1):
-                        if query_lower in line.lower():
-                            matching_lines.append({"line": i, "text": line.strip()[:100]})
-                            if len(matching_lines) >= 3:
-                                break
-
+                content_lower = content.lower()
+                if query_lower in content_lower:
+                    title = entities.HEADING_PREFIX_PATTERN.sub('', content.partition('\n')[0])
                     results.append({
                         "path": filepath,
                         "title": title,
-                        "matches": matching_lines
+                        "matches": _matching_lines(content, content_lower, query_lower)
                     })
-                    if len(results) >= 20:
+                    if len(results) >= SEARCH_MAX_RESULTS:
                         break
             except Exception:
                 pass
@@ -462,6 +916,236 @@ class MemgraphNotesServer:
         return results
 
 
+def _iter_markdown_files(
+    root: str,
+    ordered: bool = False,
+    after: Optional[str] = None,
+    linked: Optional[list] = None,
+) -> Iterator[str]:
+    """Yield every *.md file under root.
+
+    Matches recursive glob, except that IGNORED_DIRS are pruned: hidden
+    files and directories are skipped and symlinked directories are
+    followed. Each directory is walked once, so a symlink back to an
+    ancestor or a second link to the same folder does not repeat it.
+    Symlinked directories are walked after the real tree, so notes are
+    reported under their real paths where they have one.
+
+    scandir's cached entry types avoid a stat per file; only directories
+    are stat'ed. With ordered=True each directory is read in name order,
+    so repeated walks of an unchanged tree yield the same sequence.
+
+    An ordered walk can resume past after, a note path relative to root
+    in the real tree: directories that sort wholly before it are not
+    read. Symlinked directories found in them are not seen either, so
+    the caller passes linked, the queue of (path, (st_dev, st_ino))
+    symlinked directories still to walk, which the walk extends in place.
+    """
+    try:
+        st = os.stat(root)
+    except OSError:
+        return
+    # Positions in the real tree are only tracked when resuming
+    resume = _walk_position(after) if after is not None else None
+    stack = [(root, (st.st_dev, st.st_ino), () if resume else None)]
+    if linked is None:
+        linked = []
+    visited = set()
+    while stack or linked:
+        if stack:
+            path, key, position = stack.pop()
+        else:
+            (path, key), position = linked.pop(0), None
+            # The full walk reaches every real folder first, so links into
+            # the real tree are repeats, even of folders skipped above
+            if resume and _in_real_tree(root, path):
+                continue
+        if key in visited:
+            continue
+        visited.add(key)
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name) if ordered else list(it)
+            subdirs = []
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    if entry.name in IGNORED_DIRS:
+                        continue
+                    st = entry.stat()
+                    subdir = (entry.path, (st.st_dev, st.st_ino))
+                    if entry.is_symlink():
+                        linked.append(subdir)
+                        continue
+                    subdir_position = None
+                    if position is not None:
+                        subdir_position = position + ((1, entry.name),)
+                        if subdir_position < resume[:len(subdir_position)]:
+                            continue
+                    subdirs.append(subdir + (subdir_position,))
+                elif entry.name.endswith('.md') and entry.is_file():
+                    if position is not None and position + ((0, entry.name),) <= resume:
+                        continue
+                    yield entry.path
+        except OSError:
+            continue
+        # Reversed so subdirectories are popped in name order
+        stack.extend(reversed(subdirs))
+
+
+def _walk_position(rel_path: str) -> tuple:
+    """Sort key of a note path relative to root in the ordered walk.
+
+    A directory yields its files before walking its subdirectories,
+    both in name order, so files sort as (0, name) and folders as (1, name).
+    """
+    *dirs, name = rel_path.split(os.sep)
+    return tuple((1, d) for d in dirs) + ((0, name),)
+
+
+def _in_real_tree(root: str, path: str) -> bool:
+    """Whether path resolves to a folder the walk of root's real tree covers."""
+    try:
+        rel = os.path.relpath(os.path.realpath(path), os.path.realpath(root))
+    except ValueError:
+        # Different drives on Windows
+        return False
+    if rel == os.curdir:
+        return True
+    return not any(
+        part == os.pardir or part.startswith('.') or part in IGNORED_DIRS
+        for part in rel.split(os.sep)
+    )
+
+
+def _resolve_note_path(root: str, note_path: str) -> Optional[str]:
+    """Join a note resource path onto an absolute notes root.
+
+    Returns None if the path escapes the root, e.g. through '..' or an
+    absolute path. The check is lexical, so symlinked folders inside the
+    tree, which the notes walk follows, still resolve.
+    """
+    full = os.path.normpath(os.path.join(root, note_path))
+    try:
+        if os.path.commonpath([full, root]) == root:
+            return full
+    except ValueError:
+        # Different drives on Windows
+        pass
+    return None
+
+
+def _note_page(root: str, cursor: Optional[str], limit: int) -> tuple[list[str], Optional[str]]:
+    """Return up to limit note paths relative to root, from cursor onwards.
+
+    Also returns the cursor of the next page, or None if this is the last.
+    A cursor holds the last path of its page and the symlinked folders
+    queued at that point, so the walk resumes there instead of rereading
+    the notes before it. Raises ValueError for a malformed cursor.
+    """
+    prefix_len = len(os.path.join(root, ''))
+    after = None
+    linked = []
+    if cursor:
+        try:
+            after, *pending = json.loads(cursor)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid cursor: {cursor}") from None
+        if not isinstance(after, str) or _resolve_note_path(root, after) is None:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        for rel_path in pending:
+            path = _resolve_note_path(root, rel_path) if isinstance(rel_path, str) else None
+            if path is None or not os.path.islink(path):
+                raise ValueError(f"Invalid cursor: {cursor}")
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            linked.append((path, (st.st_dev, st.st_ino)))
+
+    if after is not None and _under_symlink(root, after):
+        # Resuming among the symlinked folders needs the walk's full
+        # state, so walk from the start and skip to the cursor
+        walk = _iter_markdown_files(root, ordered=True)
+        for path in walk:
+            if path[prefix_len:] == after:
+                break
+    else:
+        walk = _iter_markdown_files(root, ordered=True, after=after, linked=linked)
+
+    page = [path[prefix_len:] for path in itertools.islice(walk, limit + 1)]
+    if len(page) <= limit:
+        return page, None
+    # The queue may repeat a folder; the walk skips it the second time
+    pending = dict.fromkeys(path[prefix_len:] for path, _ in linked)
+    return page[:limit], json.dumps([page[limit - 1], *pending])
+
+
+def _under_symlink(root: str, rel_path: str) -> bool:
+    """Whether a note path relative to root passes through a symlinked folder."""
+    path = root
+    for part in rel_path.split(os.sep)[:-1]:
+        path = os.path.join(path, part)
+        if os.path.islink(path):
+            return True
+    return False
+
+
+def _matching_lines(content: str, content_lower: str, query_lower: str) -> list[dict]:
+    """Find the first SEARCH_MAX_MATCHES lines of content containing the query.
+
+    Hits are found in the lowered copy and their lines sliced from the
+    original by offset, so the file is never split into lines.
+    """
+    if len(content_lower) != len(content):
+        # A few characters grow when lowercased (e.g. 'İ'), so offsets no
+        # longer line up. Lowercasing never adds or drops newlines, so
+        # the split lines still do.
+        lines = content.split('\n')
+        matches = []
+        for i, line_lower in enumerate(content_lower.split('\n')):
+            if query_lower in line_lower:
+                matches.append({"line": i + 1, "text": lines[i].strip()[:100]})
+                if len(matches) >= SEARCH_MAX_MATCHES:
+                    break
+        return matches
+
+    matches = []
+    line_number = 1
+    counted = 0
+    pos = content_lower.find(query_lower)
+    while pos != -1 and len(matches) < SEARCH_MAX_MATCHES:
+        line_number += content_lower.count('\n', counted, pos)
+        counted = pos
+        start = content_lower.rfind('\n', 0, pos) + 1
+        end = content_lower.find('\n', pos)
+        if end == -1:
+            matches.append({"line": line_number, "text": content[start:].strip()[:100]})
+            break
+        matches.append({"line": line_number, "text": content[start:end].strip()[:100]})
+        # Continue on the next line; each line is reported once
+        pos = content_lower.find(query_lower, end + 1)
+    return matches
+
+
+def _rg_text(value: dict) -> str:
+    """Read a ripgrep JSON string field, which is base64 bytes if not UTF-8."""
+    if 'text' in value:
+        return value['text']
+    return base64.b64decode(value['bytes']).decode('utf-8', errors='ignore')
+
+
+def _read_title(filepath: str) -> str:
+    """Read a note's title from its first line, as extract_from_file does."""
+    try:
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            first_line = f.readline().rstrip('\n')
+    except OSError:
+        return Path(filepath).stem
+    return entities.HEADING_PREFIX_PATTERN.sub('', first_line)
+
+
 # Search strategy instructions for AI assistants
 SEARCH_INSTRUCTIONS = """
 ## Notes Search Strategy
@@ -512,253 +1196,291 @@ def create_server(mg_server: MemgraphNotesServer) -> Server:
     """Create the MCP server with tools and resources."""
     server = Server("memgraph-notes")
 
-    @server.list_tools()
-    async def list_tools() -> list[Tool]:
-        return [
-            Tool(
-                name="get_search_instructions",
-                description="CALL THIS FIRST before searching. Returns the recommended search strategy for finding notes efficiently. Explains which tools to use in what order.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            Tool(
-                name="find_by_tag",
-                description="[PRIORITY 1] Find notes by hashtag. Most efficient for topic searches. Use list_all_tags first to see available tags.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "tag": {
-                            "type": "string",
-                            "description": "Tag name (with or without # prefix). Examples: project, ops, tech, oncall"
-                        }
-                    },
-                    "required": ["tag"]
-                }
-            ),
-            Tool(
-                name="find_journals_by_date",
-                description="[PRIORITY 2] Find journal entries and date-prefixed notes within a date range. Journals are in /journal/YYYY-MM-DD.md format. Many notes have date prefixes like '2024-05-02 Topic.md'.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "start_date": {
-                            "type": "string",
-                            "description": "Start date in YYYY-MM-DD, YYYY-MM, or YYYY format"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "End date (optional, defaults to start_date for single day/month)"
-                        }
-                    },
-                    "required": ["start_date"]
-                }
-            ),
-            Tool(
-                name="find_by_mention",
-                description="[PRIORITY 3] Find notes mentioning a specific person (@mentions). Use list_all_persons to see known people.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "person": {
-                            "type": "string",
-                            "description": "Person name (with or without @ prefix). Example: john-doe"
-                        }
-                    },
-                    "required": ["person"]
-                }
-            ),
-            Tool(
-                name="find_by_filename",
-                description="[PRIORITY 4] Search notes by filename or title pattern. Good when you know part of the note's name.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "pattern": {
-                            "type": "string",
-                            "description": "Pattern to match in filename or title (case-insensitive)"
-                        }
-                    },
-                    "required": ["pattern"]
-                }
-            ),
-            Tool(
-                name="search_content",
-                description="[PRIORITY 6 - LAST RESORT] Full-text search in note content. Only use when tags, dates, mentions, and filename searches fail. Slower and less precise.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Text to search for in note content"
-                        }
-                    },
-                    "required": ["query"]
-                }
-            ),
-            Tool(
-                name="get_backlinks",
-                description="[PRIORITY 5 - Graph exploration] Find all notes that link TO a specific note via [[wikilinks]].",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "note_path": {
-                            "type": "string",
-                            "description": "Full path to the note file"
-                        }
-                    },
-                    "required": ["note_path"]
-                }
-            ),
-            Tool(
-                name="get_related",
-                description="[PRIORITY 5 - Graph exploration] Find notes related to a specific note by shared tags or mentions.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "note_path": {
-                            "type": "string",
-                            "description": "Full path to the note file"
-                        }
+    # The tool set is static, so describe it once per server
+    tools = [
+        Tool(
+            name="get_search_instructions",
+            description="CALL THIS FIRST before searching. Returns the recommended search strategy for finding notes efficiently. Explains which tools to use in what order.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="find_by_tag",
+            description="[PRIORITY 1] Find notes by hashtag. Most efficient for topic searches. Use list_all_tags first to see available tags.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tag": {
+                        "type": "string",
+                        "description": "Tag name (with or without # prefix). Examples: project, ops, tech, oncall"
+                    }
+                },
+                "required": ["tag"]
+            }
+        ),
+        Tool(
+            name="find_journals_by_date",
+            description="[PRIORITY 2] Find journal entries and date-prefixed notes within a date range. Journals are in /journal/YYYY-MM-DD.md format. Many notes have date prefixes like '2024-05-02 Topic.md'.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "start_date": {
+                        "type": "string",
+                        "description": "Start date in YYYY-MM-DD, YYYY-MM, or YYYY format"
                     },
-                    "required": ["note_path"]
-                }
-            ),
-            Tool(
-                name="get_note_context",
-                description="[PRIORITY 5 - Graph exploration] Get full context for a note: outgoing links, backlinks, tags, and mentions.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "note_path": {
-                            "type": "string",
-                            "description": "Full path to the note file"
-                        }
-                    },
-                    "required": ["note_path"]
-                }
-            ),
-            Tool(
-                name="list_all_tags",
-                description="List all hashtags used in notes with usage counts. Use this to discover available tags before using find_by_tag.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            Tool(
-                name="list_all_persons",
-                description="List all persons mentioned in notes. Use this to discover people before using find_by_mention.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            Tool(
-                name="query_graph",
-                description="Execute a raw Cypher query on the graph database (for advanced exploration)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "cypher": {
-                            "type": "string",
-                            "description": "Cypher query to execute"
-                        },
-                        "params": {
-                            "type": "object",
-                            "description": "Query parameters (optional)"
-                        }
+                    "end_date": {
+                        "type": "string",
+                        "description": "End date (optional, defaults to start_date for single day/month)"
+                    }
+                },
+                "required": ["start_date"]
+            }
+        ),
+        Tool(
+            name="find_by_mention",
+            description="[PRIORITY 3] Find notes mentioning a specific person (@mentions). Use list_all_persons to see known people.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "person": {
+                        "type": "string",
+                        "description": "Person name (with or without @ prefix). Example: john-doe"
+                    }
+                },
+                "required": ["person"]
+            }
+        ),
+        Tool(
+            name="find_by_filename",
+            description="[PRIORITY 4] Search notes by filename or title pattern. Good when you know part of the note's name.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Pattern to match in filename or title (case-insensitive)"
+                    }
+                },
+                "required": ["pattern"]
+            }
+        ),
+        Tool(
+            name="search_content",
+            description="[PRIORITY 6 - LAST RESORT] Full-text search in note content. Only use when tags, dates, mentions, and filename searches fail. Slower and less precise.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Text to search for in note content"
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
+        Tool(
+            name="get_backlinks",
+            description="[PRIORITY 5 - Graph exploration] Find all notes that link TO a specific note via [[wikilinks]].",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "note_path": {
+                        "type": "string",
+                        "description": "Full path to the note file"
+                    }
+                },
+                "required": ["note_path"]
+            }
+        ),
+        Tool(
+            name="get_related",
+            description="[PRIORITY 5 - Graph exploration] Find notes related to a specific note by shared tags or mentions.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "note_path": {
+                        "type": "string",
+                        "description": "Full path to the note file"
+                    }
+                },
+                "required": ["note_path"]
+            }
+        ),
+        Tool(
+            name="get_note_context",
+            description="[PRIORITY 5 - Graph exploration] Get full context for a note: outgoing links, backlinks, tags, and mentions.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "note_path": {
+                        "type": "string",
+                        "description": "Full path to the note file"
+                    }
+                },
+                "required": ["note_path"]
+            }
+        ),
+        Tool(
+            name="list_all_tags",
+            description="List all hashtags used in notes with usage counts. Use this to discover available tags before using find_by_tag.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="list_all_persons",
+            description="List all persons mentioned in notes. Use this to discover people before using find_by_mention.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="query_graph",
+            description="Execute a raw Cypher query on the graph database (for advanced exploration)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cypher": {
+                        "type": "string",
+                        "description": "Cypher query to execute"
                     },
-                    "required": ["cypher"]
-                }
-            ),
-            Tool(
-                name="get_graph_stats",
-                description="Get statistics about the knowledge graph (counts of notes, tags, links, etc.)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
+                    "params": {
+                        "type": "object",
+                        "description": "Query parameters (optional)"
+                    }
+                },
+                "required": ["cypher"]
+            }
+        ),
+        Tool(
+            name="get_graph_stats",
+            description="Get statistics about the knowledge graph (counts of notes, tags, links, etc.)",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="cache_stats",
+            description="Get hit/miss counts for the server's short-lived cache of read query results",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="reindex_notes",
+            description="Reindex all notes from the notes directory into the graph database. Only notes whose content changed are rewritten and notes whose files were deleted are removed; set full to clear the existing graph and rebuild it from scratch.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "full": {
+                        "type": "boolean",
+                        "description": "Clear the graph and rebuild everything (default: false)"
+                    }
                 }
-            ),
-            Tool(
-                name="reindex_notes",
-                description="Reindex all notes from the notes directory into the graph database. This clears the existing graph and rebuilds it from scratch.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-        ]
+            }
+        ),
+    ]
+
+    @server.list_tools()
+    async def list_tools() -> list[Tool]:
+        return tools
+
+    # mgclient and file reads are blocking; run tool calls and resource
+    # reads on worker threads so concurrent requests overlap instead of
+    # stalling the event loop one at a time
+    tool_executor = ThreadPoolExecutor(
+        max_workers=CONNECTION_POOL_SIZE, thread_name_prefix="memgraph-tool")
+
+    instructions = [TextContent(type="text", text=SEARCH_INSTRUCTIONS)]
 
     @server.call_tool()
     async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(tool_executor, run_tool, name, arguments)
+
+    def run_tool(name: str, arguments: dict) -> list[TextContent]:
         try:
             if name == "get_search_instructions":
-                return [TextContent(type="text", text=SEARCH_INSTRUCTIONS)]
+                return instructions
 
             elif name == "find_journals_by_date":
                 results = mg_server.find_journals_by_date_range(
                     arguments["start_date"],
                     arguments.get("end_date")
                 )
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "find_by_filename":
                 results = mg_server.find_notes_by_filename_pattern(arguments["pattern"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "search_content":
                 results = mg_server.search_note_content(arguments["query"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "search_notes":
                 # Keep for backwards compatibility, redirects to filename search
                 results = mg_server.find_notes_by_filename_pattern(arguments["query"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "get_backlinks":
                 results = mg_server.get_backlinks(arguments["note_path"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "get_related":
                 results = mg_server.get_related(arguments["note_path"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "get_note_context":
                 results = mg_server.get_note_context(arguments["note_path"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "find_by_tag":
                 results = mg_server.find_by_tag(arguments["tag"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "find_by_mention":
                 results = mg_server.find_by_mention(arguments["person"])
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "list_all_tags":
                 results = mg_server.get_all_tags()
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "list_all_persons":
                 results = mg_server.get_all_persons()
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "query_graph":
-                results = mg_server.query(
-                    arguments["cypher"],
-                    arguments.get("params", {})
-                )
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                # Arbitrary Cypher may write to the graph, so it must not
+                # run in the middle of a reindex
+                with mg_server._reindex_lock:
+                    try:
+                        results = mg_server.query(
+                            arguments["cypher"],
+                            arguments.get("params", {})
+                        )
+                    finally:
+                        mg_server.clear_cache()
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "get_graph_stats":
                 results = mg_server.get_graph_stats()
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                return [TextContent(type="text", text=_to_json(results))]
+
+            elif name == "cache_stats":
+                results = mg_server.cache_stats()
+                return [TextContent(type="text", text=_to_json(results))]
 
             elif name == "reindex_notes":
-                results = mg_server.reindex_all_notes()
-                return [TextContent(type="text", text=json.dumps(results, indent=2))]
+                results = mg_server.reindex_all_notes(full=arguments.get("full", False))
+                return [TextContent(type="text", text=_to_json(results))]
 
             else:
                 return [TextContent(type="text", text=f"Unknown tool: {name}")]
@@ -766,39 +1488,53 @@ def create_server(mg_server: MemgraphNotesServer) -> Server:
         except Exception as e:
             return [TextContent(type="text", text=f"Error: {str(e)}")]
 
-    @server.list_resources()
-    async def list_resources() -> list[Resource]:
-        # List available note files as resources
-        resources = []
-        try:
-            notes_path = Path(mg_server.notes_root)
-            for md_file in notes_path.rglob("*.md"):
-                rel_path = md_file.relative_to(notes_path)
-                resources.append(Resource(
-                    uri=f"note://{rel_path}",
-                    name=str(rel_path),
-                    description=f"Markdown note: {rel_path}",
-                    mimeType="text/markdown"
-                ))
-        except Exception:
-            pass
-        return resources[:50]  # Limit to 50 resources
+    # Registered directly: handlers added with @server.list_resources() are
+    # not given the request, so they cannot read its pagination cursor
+    async def list_resources(request: ListResourcesRequest) -> ServerResult:
+        # Errors, including a malformed cursor, propagate to the client
+        # rather than ending the listing early with an empty page
+        cursor = request.params.cursor if request.params else None
+        loop = asyncio.get_running_loop()
+        rel_paths, next_cursor = await loop.run_in_executor(
+            tool_executor, _note_page, os.path.abspath(mg_server.notes_root),
+            cursor, RESOURCES_PAGE_SIZE)
+        resources = [
+            Resource(
+                # URIs use '/' whatever the platform's separator
+                uri=NOTE_URI_PREFIX + rel_path.replace(os.sep, '/'),
+                name=rel_path,
+                description=f"Markdown note: {rel_path}",
+                mimeType="text/markdown"
+            )
+            for rel_path in rel_paths
+        ]
+        return ServerResult(ListResourcesResult(resources=resources, nextCursor=next_cursor))
+
+    server.request_handlers[ListResourcesRequest] = list_resources
 
     @server.list_resource_templates()
     async def list_resource_templates() -> list[ResourceTemplate]:
         return [
             ResourceTemplate(
-                uriTemplate="note://{path}",
+                uriTemplate=NOTE_URI_PREFIX + "{path}",
                 name="Note file",
                 description="Read a markdown note file by path"
             )
         ]
 
+    notes_root = os.path.abspath(mg_server.notes_root)
+
     @server.read_resource()
     async def read_resource(uri: str) -> str:
-        if uri.startswith("note://"):
-            note_path = uri[7:]  # Remove "note://" prefix
-            content = mg_server.read_note_content(note_path)
+        # The SDK passes a pydantic AnyUrl
+        uri = str(uri)
+        if uri.startswith(NOTE_URI_PREFIX):
+            note_path = _resolve_note_path(notes_root, uri[len(NOTE_URI_PREFIX):])
+            if note_path is None:
+                return f"Error: path outside notes root: {uri}"
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(
+                tool_executor, mg_server.read_note_content, note_path)
             return content
         return f"Unknown resource: {uri}"
 
@@ -822,7 +1558,8 @@ async def main():
     # Create server instance
     mg_server = MemgraphNotesServer(host=host, port=port, notes_root=notes_root)
 
-    # Try to connect (will retry on first query if it fails)
+    # Check Memgraph is reachable. Tool calls connect from their worker
+    # threads on first use.
     if mg_server.connect():
         print(f"Connected to Memgraph at {host}:{port}", file=sys.stderr)
     else:
@@ -0,0 +1,577 @@
+"""Tests for the Neovim bridge."""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, PropertyMock
+
+from nvim_markdown_notes_memgraph import bridge as bridge_module
+from nvim_markdown_notes_memgraph.bridge import MemgraphBridge
+
+
+def make_bridge():
+    """Create a bridge wired to a mocked connection and cursor."""
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = None
+    mock_conn.cursor.return_value = mock_cursor
+
+    bridge = MemgraphBridge()
+    bridge.connection = mock_conn
+    return bridge, mock_cursor
+
+
+def read_response(capsys) -> dict:
+    """Parse the last JSON response written to stdout."""
+    lines = capsys.readouterr().out.strip().split('\n')
+    return json.loads(lines[-1])
+
+
+class TestUpdateNote:
+    """Test update_note query batching (mocked)."""
+
+    def test_update_note_batches_relationships(self, capsys):
+        """Test that each relationship type is written with one UNWIND query."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchone.return_value = ['stale-hash']
+
+        result = bridge.update_note(
+            path='/notes/meeting.md',
+            title='Meeting',
+            content='# Meeting',
+            wikilinks=[
+                {'target': 'a', 'target_path': '/notes/a.md', 'line_number': 1},
+                {'target': 'b', 'target_path': '/notes/b.md', 'line_number': 2},
+            ],
+            mentions=[
+                {'name': 'alice', 'line_number': 1},
+                {'name': 'bob', 'line_number': 3},
+            ],
+            hashtags=[
+                {'name': 'tech', 'line_number': 2},
+                {'name': 'ops', 'line_number': 2},
+            ],
+        )
+
+        assert result is True
+        # Hash lookup, note merge + one query each for links, mentions and tags
+        assert mock_cursor.execute.call_count == 5
+
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert 'content_hash' in queries[0]
+        assert 'DELETE r' in queries[1]
+        assert all('UNWIND $rows' in q for q in queries[2:])
+
+        tag_params = mock_cursor.execute.call_args_list[4][0][1]
+        assert tag_params['keys'] == ['tech', 'ops']
+
+        link_params = mock_cursor.execute.call_args_list[2][0][1]
+        assert link_params['rows'] == [
+            {'source_path': '/notes/meeting.md', 'target_path': '/notes/a.md', 'line_number': 1},
+            {'source_path': '/notes/meeting.md', 'target_path': '/notes/b.md', 'line_number': 2},
+        ]
+
+        response = read_response(capsys)
+        assert response['success'] is True
+        assert response['data']['wikilinks_count'] == 2
+
+    def test_update_note_deduplicates_rows(self, capsys):
+        """Test that repeated (target, line) pairs are sent once."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note(
+            '/notes/todo.md', 'Todo', 'text', [],
+            [],
+            [
+                {'name': 'todo', 'line_number': 1},
+                {'name': 'todo', 'line_number': 1},
+                {'name': 'todo', 'line_number': 4},
+                {'name': '', 'line_number': 5},
+            ],
+        )
+
+        tag_params = mock_cursor.execute.call_args_list[2][0][1]
+        assert tag_params['keys'] == ['todo']
+        assert [r['line_number'] for r in tag_params['rows']] == [1, 4]
+
+    def test_update_note_skips_empty_relationship_types(self, capsys):
+        """Test that no UNWIND query is sent for empty entity lists."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note('/notes/plain.md', 'Plain', 'text', [], [], [])
+
+        assert mock_cursor.execute.call_count == 2
+
+    def test_update_note_new_note_skips_relationship_delete(self, capsys):
+        """Test that a note not yet in the graph is merged without a delete."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note('/notes/new.md', 'New', 'text', [], [], [])
+
+        merge_query = mock_cursor.execute.call_args_list[1][0][0]
+        assert 'MERGE (n:Note' in merge_query
+        assert 'DELETE' not in merge_query
+
+    def test_update_note_unchanged_content_short_circuits(self, capsys):
+        """Test that an unchanged content hash skips the rewrite."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchone.return_value = [bridge._compute_content_hash('text')]
+
+        result = bridge.update_note(
+            '/notes/same.md', 'Same', 'text',
+            [{'target_path': '/notes/a.md', 'line_number': 1}], [], []
+        )
+
+        assert result is True
+        assert mock_cursor.execute.call_count == 1
+        response = read_response(capsys)
+        assert response['data']['unchanged'] is True
+
+    def test_update_note_person_note(self, capsys):
+        """Test that notes in the people directory get a HAS_NOTE relationship."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note('/notes/people/alice.md', 'Alice', 'text', [], [], [])
+
+        query, params = mock_cursor.execute.call_args[0]
+        assert 'HAS_NOTE' in query
+        assert params['rows'] == [{'person_name': 'alice', 'path': '/notes/people/alice.md'}]
+
+    def test_update_note_filename_and_person_name(self, capsys):
+        """Test filename and person name extraction from the note path."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note('/notes/people/jane.doe.md', 'Jane', 'text', [], [], [])
+        bridge.update_note('/notes/people/README', 'Readme', 'more', [], [], [])
+
+        merges = [c[0][1] for c in mock_cursor.execute.call_args_list if 'MERGE (n:Note' in c[0][0]]
+        assert [m['filename'] for m in merges] == ['jane.doe.md', 'README']
+        people = [c[0][1]['rows'][0]['person_name'] for c in mock_cursor.execute.call_args_list
+                  if 'HAS_NOTE' in c[0][0]]
+        assert people == ['jane.doe', 'README']
+
+    def test_update_note_not_connected(self, capsys):
+        """Test that update_note fails cleanly without a connection."""
+        bridge = MemgraphBridge()
+
+        assert bridge.update_note('/notes/a.md', 'A', '', [], [], []) is False
+        assert read_response(capsys)['error'] == 'Not connected'
+
+
+class TestReindex:
+    """Test reindex batching (mocked)."""
+
+    def test_reindex_uses_fixed_number_of_queries(self, capsys):
+        """Test that reindex issues one UNWIND per type regardless of note count."""
+        bridge, mock_cursor = make_bridge()
+        notes = [
+            {
+                'path': f'/notes/note{i}.md',
+                'title': f'Note {i}',
+                'content': f'content {i}',
+                'wikilinks': [{'target_path': '/notes/other.md', 'line_number': 1}],
+                'mentions': [{'name': 'alice', 'line_number': 2}],
+                'hashtags': [{'name': 'tech', 'line_number': 3}],
+            }
+            for i in range(10)
+        ]
+
+        assert bridge.reindex(notes) is True
+
+        unwind_calls = [
+            c for c in mock_cursor.execute.call_args_list if 'UNWIND $rows' in c[0][0]
+        ]
+        # Notes, links, mentions and tags
+        assert len(unwind_calls) == 4
+        assert len(unwind_calls[0][0][1]['rows']) == 10
+
+        # Shared targets are merged once, relationships once per note
+        for call in unwind_calls[1:]:
+            assert len(call[0][1]['keys']) == 1
+            assert len(call[0][1]['rows']) == 10
+
+        response = read_response(capsys)
+        assert response['data']['indexed'] == 10
+        assert response['data']['errors'] == []
+
+    def test_reindex_shares_one_timestamp(self, capsys):
+        """Test that every note in a reindex gets the same last_modified."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.reindex([{'path': f'/notes/n{i}.md'} for i in range(5)])
+
+        note_call = next(
+            c for c in mock_cursor.execute.call_args_list if 'UNWIND $rows' in c[0][0]
+        )
+        timestamps = {row['last_modified'] for row in note_call[0][1]['rows']}
+        assert len(timestamps) == 1
+
+    def test_reindex_reports_notes_without_path(self, capsys):
+        """Test that notes missing a path are reported as errors."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.reindex([{'path': '/notes/a.md'}, {'title': 'No path'}])
+
+        response = read_response(capsys)
+        assert response['data']['indexed'] == 1
+        assert response['data']['total'] == 2
+        assert len(response['data']['errors']) == 1
+
+    def test_reindex_commits_once(self, capsys):
+        """Test that reindex writes in a single explicit transaction."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.reindex([{'path': '/notes/a.md'}, {'path': '/notes/b.md'}])
+
+        assert bridge.connection.commit.call_count == 1
+        bridge.connection.rollback.assert_not_called()
+        assert bridge.connection.autocommit is True
+
+    def test_reindex_rolls_back_on_failure(self, capsys):
+        """Test that a failed reindex is rolled back."""
+        bridge, mock_cursor = make_bridge()
+        bridge._existing_indexes = set(bridge_module.SCHEMA_INDEXES)
+        # Clear succeeds, the notes UNWIND fails
+        mock_cursor.execute.side_effect = [None, Exception("boom")]
+
+        assert bridge.reindex([{'path': '/notes/a.md'}]) is False
+
+        bridge.connection.rollback.assert_called_once()
+        bridge.connection.commit.assert_not_called()
+        assert bridge.connection.autocommit is True
+        assert 'boom' in read_response(capsys)['error']
+
+    def test_reindex_drops_connection_it_cannot_restore(self, capsys):
+        """Test that a failed autocommit restore does not mask the reindex error."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.execute.side_effect = Exception("boom")
+        bridge.connection.rollback.side_effect = RuntimeError("rollback failed")
+
+        def autocommit(*value):
+            if value == (True,):
+                raise RuntimeError("cannot change autocommit")
+        type(bridge.connection).autocommit = PropertyMock(side_effect=autocommit)
+
+        assert bridge.reindex([{'path': '/notes/a.md'}]) is False
+
+        assert 'boom' in read_response(capsys)['error']
+        # The next command reconnects instead of reusing the broken connection
+        assert bridge.connection is None
+        assert bridge._cursor is None
+
+
+class TestEnsureSchema:
+    """Test index creation (mocked)."""
+
+    def test_only_missing_indexes_are_created(self, capsys):
+        """Test that indexes reported by SHOW INDEX INFO are not recreated."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchall.return_value = [
+            ('label+property', 'Note', 'path', 10),
+            ('label+property', 'Tag', ['name'], 3),
+        ]
+
+        bridge._ensure_schema()
+
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert queries == [
+            'SHOW INDEX INFO',
+            'CREATE INDEX ON :Note(filename)',
+            'CREATE INDEX ON :Person(name)',
+        ]
+
+    def test_schema_checked_once_per_connection(self, capsys):
+        """Test that repeated reindexes do not touch the schema again."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchall.return_value = []
+
+        bridge._ensure_schema()
+        mock_cursor.execute.reset_mock()
+        bridge.reindex([])
+
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert not any('INDEX' in q for q in queries)
+
+
+class TestCursorReuse:
+    """Test cursor caching (mocked)."""
+
+    def test_cursor_is_created_once_per_connection(self, capsys):
+        """Test that consecutive calls share one cursor."""
+        bridge, mock_cursor = make_bridge()
+
+        bridge.update_note('/notes/a.md', 'A', 'a', [], [], [])
+        bridge.get_stats()
+        bridge.delete_note('/notes/a.md')
+
+        assert bridge.connection.cursor.call_count == 1
+
+    def test_failed_health_check_drops_cursor(self, capsys):
+        """Test that a failed health check marks the connection for repair."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.execute.side_effect = Exception("gone")
+
+        assert bridge.health_check() is False
+        assert bridge._degraded is True
+        assert bridge._cursor is None
+
+
+class TestReconnect:
+    """Test automatic reconnection (mocked)."""
+
+    def connected_bridge(self, monkeypatch, connections):
+        """Connect a bridge whose mgclient.connect yields connections in turn."""
+        mock_connect = MagicMock(side_effect=connections)
+        monkeypatch.setattr(bridge_module.mgclient, 'connect', mock_connect)
+        monkeypatch.setattr(bridge_module.time, 'sleep', MagicMock())
+
+        bridge = MemgraphBridge()
+        assert bridge.connect('memgraph', 7688) is True
+        return bridge, mock_connect
+
+    def test_reconnects_after_failed_health_check(self, monkeypatch, capsys):
+        """Test that the next command reopens a degraded connection."""
+        first, second = MagicMock(), MagicMock()
+        bridge, mock_connect = self.connected_bridge(monkeypatch, [first, second])
+        first.cursor.return_value.execute.side_effect = Exception("reset")
+
+        assert bridge.health_check() is False
+        bridge.delete_note('/notes/a.md')
+
+        assert bridge.connection is second
+        mock_connect.assert_called_with(host='memgraph', port=7688)
+
+    def test_reconnect_retries_with_backoff(self, monkeypatch, capsys):
+        """Test that reconnecting retries before giving up."""
+        bridge, mock_connect = self.connected_bridge(
+            monkeypatch, [MagicMock()] + [Exception("refused")] * 3
+        )
+        bridge._degraded = True
+
+        assert bridge.delete_note('/notes/a.md') is False
+        assert read_response(capsys)['error'] == 'Not connected'
+        assert mock_connect.call_count == 4
+        assert [c[0][0] for c in bridge_module.time.sleep.call_args_list] == [0.05, 0.1]
+
+    def test_bad_connection_status_triggers_reconnect(self, monkeypatch, capsys):
+        """Test that a connection reported as bad is replaced."""
+        first, second = MagicMock(), MagicMock()
+        bridge, mock_connect = self.connected_bridge(monkeypatch, [first, second])
+        first.status = bridge_module.mgclient.CONN_STATUS_BAD
+
+        assert bridge.health_check() is True
+        assert bridge.connection is second
+
+    def test_never_connected_does_not_reconnect(self, monkeypatch, capsys):
+        """Test that commands before connect() fail without connecting."""
+        mock_connect = MagicMock()
+        monkeypatch.setattr(bridge_module.mgclient, 'connect', mock_connect)
+
+        assert MemgraphBridge().query('RETURN 1') is False
+        mock_connect.assert_not_called()
+
+
+class TestDeleteNote:
+    """Test delete_note and gc (mocked)."""
+
+    def test_delete_note_single_query(self, capsys):
+        """Test that the note and its orphaned neighbours go in one query."""
+        bridge, mock_cursor = make_bridge()
+
+        assert bridge.delete_note('/notes/a.md') is True
+
+        query, params = mock_cursor.execute.call_args[0]
+        assert mock_cursor.execute.call_count == 1
+        assert 'DETACH DELETE n' in query
+        assert 'MATCH (t:Tag)' not in query
+        assert params == {'path': '/notes/a.md'}
+
+    def test_gc_runs_full_cleanup_in_transaction(self, capsys):
+        """Test that gc sweeps every orphaned tag and person."""
+        bridge, mock_cursor = make_bridge()
+
+        assert bridge.gc() is True
+
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert 'MATCH (t:Tag)' in queries[0]
+        assert 'MATCH (p:Person)' in queries[1]
+        assert bridge.connection.commit.call_count == 1
+
+
+class TestQuery:
+    """Test query (mocked)."""
+
+    def test_query_skips_fetch_without_result_columns(self, capsys):
+        """Test that write-only statements are not fetched."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.description = None
+
+        assert bridge.query('CREATE (:Note {path: "/a.md"})') is True
+        mock_cursor.fetchall.assert_not_called()
+        assert read_response(capsys)['data'] == {'results': [], 'count': 0}
+
+    def test_query_converts_rows(self, capsys):
+        """Test that nodes are converted to their properties."""
+        bridge, mock_cursor = make_bridge()
+        node = MagicMock(properties={'path': '/notes/a.md'})
+        mock_cursor.fetchall.return_value = [(node, 1), (node, 2)]
+
+        assert bridge.query('MATCH (n:Note) RETURN n, 1') is True
+
+        data = read_response(capsys)['data']
+        assert data['results'] == [[{'path': '/notes/a.md'}, 1], [{'path': '/notes/a.md'}, 2]]
+        assert 'truncated' not in data
+
+    def test_query_limit_truncates(self, capsys):
+        """Test that a limit caps the returned rows and flags remaining ones."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchall.return_value = [(i,) for i in range(5)]
+
+        bridge.query('MATCH (n) RETURN id(n)', limit=3)
+
+        data = read_response(capsys)['data']
+        assert data['results'] == [[0], [1], [2]]
+        assert data['count'] == 3
+        assert data['truncated'] is True
+
+    def test_query_limit_not_reached(self, capsys):
+        """Test that a result within the limit is not flagged as truncated."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchall.return_value = [(i,) for i in range(3)]
+
+        bridge.query('MATCH (n) RETURN id(n)', limit=3)
+
+        data = read_response(capsys)['data']
+        assert data['count'] == 3
+        assert data['truncated'] is False
+
+    def test_query_rejects_negative_limit(self, capsys):
+        """Test that a negative limit is rejected before the query runs."""
+        bridge, mock_cursor = make_bridge()
+
+        assert bridge.query('MATCH (n) RETURN id(n)', limit=-1) is False
+
+        mock_cursor.execute.assert_not_called()
+        assert read_response(capsys)['error'].startswith('Invalid limit: -1')
+
+    def test_query_rejects_non_integer_limit(self, capsys):
+        """Test that a limit sent as a JSON string is rejected with a clear error."""
+        bridge, mock_cursor = make_bridge()
+
+        assert bridge.query('MATCH (n) RETURN id(n)', limit='5') is False
+
+        mock_cursor.execute.assert_not_called()
+        assert read_response(capsys)['error'].startswith("Invalid limit: '5'")
+
+
+class TestGetStats:
+    """Test get_stats (mocked)."""
+
+    def test_get_stats_single_query(self, capsys):
+        """Test that all counts are fetched in one round-trip."""
+        bridge, mock_cursor = make_bridge()
+        mock_cursor.fetchone.return_value = (10, 5, 3, 20, 8, 12)
+
+        assert bridge.get_stats() is True
+        assert mock_cursor.execute.call_count == 1
+        assert read_response(capsys)['data'] == {
+            'notes': 10,
+            'persons': 5,
+            'tags': 3,
+            'links': 20,
+            'mentions': 8,
+            'tag_usages': 12,
+        }
+
+
+class TestRun:
+    """Test the stdio command loop."""
+
+    def run_bridge(self, monkeypatch, payload: bytes) -> MemgraphBridge:
+        """Run a bridge reading payload from a pipe standing in for stdin."""
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, payload)
+        os.close(write_fd)
+        monkeypatch.setattr(sys, 'stdin', open(read_fd, 'rb'))
+
+        bridge = MemgraphBridge()
+        bridge.run()
+        sys.stdin.close()
+        return bridge
+
+    def test_run_answers_each_line_in_order(self, monkeypatch, capsys):
+        """Test that every line in a chunk gets one response, in order."""
+        self.run_bridge(
+            monkeypatch,
+            b'{"action": "stats"}\n'
+            b'not json\n'
+            b'\n'
+            b'{"action": "bogus"}'
+        )
+
+        responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(responses) == 3
+        assert responses[0]['error'] == 'Not connected'
+        assert responses[1]['error'].startswith('Invalid JSON')
+        assert responses[2]['error'] == 'Unknown action: bogus'
+
+    def test_run_joins_lines_split_across_reads(self, monkeypatch, capsys):
+        """Test that a line spanning several reads is handled as one command."""
+        monkeypatch.setattr(bridge_module, 'READ_CHUNK_SIZE', 4)
+        self.run_bridge(
+            monkeypatch,
+            b'{"action": "bogus1"}\n{"action": "bogus2"}\n\n{"action": "bogus3"}'
+        )
+
+        errors = [json.loads(line)['error'] for line in capsys.readouterr().out.splitlines()]
+        assert errors == [f'Unknown action: bogus{i}' for i in (1, 2, 3)]
+
+    def test_run_writes_every_queued_response(self, monkeypatch, capsys):
+        """Test that the writer thread delivers more responses than it queues."""
+        payload = b''.join(
+            b'{"action": "bogus%d"}\n' % i for i in range(200)
+        )
+        self.run_bridge(monkeypatch, payload)
+
+        errors = [json.loads(line)['error'] for line in capsys.readouterr().out.splitlines()]
+        assert errors == [f'Unknown action: bogus{i}' for i in range(200)]
+
+    def test_run_stops_on_quit(self, monkeypatch, capsys):
+        """Test that commands after quit are not executed."""
+        bridge = self.run_bridge(
+            monkeypatch, b'{"action": "quit"}\n{"action": "stats"}\n'
+        )
+
+        assert capsys.readouterr().out == ''
+        assert bridge._out_q is None
+
+
+class TestJson:
+    """Test JSON encoding with and without orjson."""
+
+    def test_fallback_without_orjson(self, monkeypatch, capsys):
+        """Test that the stdlib json module is used when orjson is missing."""
+        monkeypatch.setattr(bridge_module, 'HAS_ORJSON', False)
+        bridge = MemgraphBridge()
+
+        bridge.send_response(True, data={'title': 'Café'})
+
+        assert read_response(capsys)['data'] == {'title': 'Café'}
+        assert bridge_module._loads(b'{"a": 1}') == {'a': 1}
+
+    def test_invalid_json_reported(self, capsys):
+        """Test that decode errors from either backend are reported."""
+        bridge = MemgraphBridge()
+
+        assert bridge._handle_line(b'{bad') is True
+        assert read_response(capsys)['error'].startswith('Invalid JSON')
+
+    def test_unencodable_response_reported(self, capsys):
+        """Test that a result that cannot be encoded still gets a response."""
+        bridge = MemgraphBridge()
+
+        bridge.send_response(True, data={'value': object()})
+
+        response = read_response(capsys)
+        assert response['success'] is False
+        assert response['error'].startswith('Failed to encode response')
@@ -1,16 +1,28 @@
 """Tests for CLI commands."""
 
 import json
+import os
+
+import pytest
 from click.testing import CliRunner
 from nvim_markdown_notes_memgraph.cli import main
 
+# --notes-root must exist; help output never touches it, so any existing
+# directory will do
+EXISTING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="module")
+def runner():
+    """A CliRunner shared by the tests in this module; it holds no state."""
+    return CliRunner()
+
 
 class TestCLIHelp:
     """Test CLI help output."""
 
-    def test_main_help(self):
+    def test_main_help(self, runner):
         """Test that main --help works."""
-        runner = CliRunner()
         result = runner.invoke(main, ['--help'])
 
         assert result.exit_code == 0
@@ -18,90 +30,30 @@ class TestCLIHelp:
         assert 'Manage Memgraph and MCP server' in result.output
         assert '--notes-root' in result.output
 
-    def test_start_help(self):
-        """Test that start --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'start', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Start Docker Compose services' in result.output
-
-    def test_stop_help(self):
-        """Test that stop --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'stop', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Stop Docker Compose services' in result.output
-
-    def test_status_help(self):
-        """Test that status --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'status', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Show status of Docker Compose services' in result.output
+    @pytest.mark.parametrize("command,expected", [
+        ('start', ['Start Docker Compose services']),
+        ('stop', ['Stop Docker Compose services']),
+        ('status', ['Show status of Docker Compose services']),
+        ('config', ['Output MCP JSON configuration', '--memgraph-host', '--memgraph-port']),
+        ('serve', ['Run the MCP server directly']),
+        ('bridge', ['Run the Neovim bridge']),
+    ])
+    def test_subcommand_help(self, runner, command, expected):
+        """Test that each subcommand's --help works."""
+        result = runner.invoke(main, ['--notes-root', EXISTING_DIR, command, '--help'])
 
-    def test_config_help(self):
-        """Test that config --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'config', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Output MCP JSON configuration' in result.output
-            assert '--memgraph-host' in result.output
-            assert '--memgraph-port' in result.output
-
-    def test_serve_help(self):
-        """Test that serve --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'serve', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Run the MCP server directly' in result.output
-
-    def test_bridge_help(self):
-        """Test that bridge --help works."""
-        runner = CliRunner()
-        with runner.isolated_filesystem():
-            import os
-            notes_dir = os.path.join(os.getcwd(), 'notes')
-            os.makedirs(notes_dir, exist_ok=True)
-            result = runner.invoke(main, ['--notes-root', notes_dir, 'bridge', '--help'])
-
-            assert result.exit_code == 0
-            assert 'Run the Neovim bridge' in result.output
+        assert result.exit_code == 0
+        for text in expected:
+            assert text in result.output
 
 
 class TestConfigCommand:
     """Test config command output."""
 
-    def test_config_output_valid_json(self):
+    def test_config_output_valid_json(self, runner):
         """Test that config outputs valid JSON."""
-        runner = CliRunner()
         with runner.isolated_filesystem():
             # Create a temporary notes directory
-            import os
             notes_dir = os.path.join(os.getcwd(), 'notes')
             os.makedirs(notes_dir, exist_ok=True)
 
@@ -119,12 +71,24 @@ class TestConfigCommand:
             # Should be a dict
             assert isinstance(config, dict)
 
-    def test_config_has_expected_keys(self):
+    def test_config_output_same_without_orjson(self, runner, monkeypatch):
+        """Test that the stdlib fallback prints identical JSON."""
+        with runner.isolated_filesystem():
+            import sys
+            notes_dir = os.path.join(os.getcwd(), 'notes')
+            os.makedirs(notes_dir, exist_ok=True)
+
+            fast = runner.invoke(main, ['--notes-root', notes_dir, 'config'])
+            monkeypatch.setitem(sys.modules, 'orjson', None)
+            fallback = runner.invoke(main, ['--notes-root', notes_dir, 'config'])
+
+            assert fallback.exit_code == 0
+            assert fallback.output == fast.output
+
+    def test_config_has_expected_keys(self, runner):
         """Test that config output has expected keys."""
-        runner = CliRunner()
         with runner.isolated_filesystem():
             # Create a temporary notes directory
-            import os
             notes_dir = os.path.join(os.getcwd(), 'notes')
             os.makedirs(notes_dir, exist_ok=True)
 
@@ -159,12 +123,10 @@ class TestConfigCommand:
             assert 'MEMGRAPH_HOST' in server_config['env']
             assert 'MEMGRAPH_PORT' in server_config['env']
 
-    def test_config_custom_memgraph_host_port(self):
+    def test_config_custom_memgraph_host_port(self, runner):
         """Test config with custom Memgraph host and port."""
-        runner = CliRunner()
         with runner.isolated_filesystem():
             # Create a temporary notes directory
-            import os
             notes_dir = os.path.join(os.getcwd(), 'notes')
             os.makedirs(notes_dir, exist_ok=True)
 
@@ -184,12 +146,10 @@ class TestConfigCommand:
             assert server_config['env']['MEMGRAPH_HOST'] == 'custom-host'
             assert server_config['env']['MEMGRAPH_PORT'] == '9999'
 
-    def test_config_notes_root_in_env(self):
+    def test_config_notes_root_in_env(self, runner):
         """Test that notes root is properly included in config."""
-        runner = CliRunner()
         with runner.isolated_filesystem():
             # Create a temporary notes directory
-            import os
             notes_dir = os.path.join(os.getcwd(), 'my-notes')
             os.makedirs(notes_dir, exist_ok=True)
 
@@ -202,3 +162,33 @@ class TestConfigCommand:
 
             # Verify notes root is set correctly
             assert notes_dir in server_config['env']['NOTES_ROOT']
+
+
+class TestCLIStartup:
+    """Test that the CLI defers heavy imports to its subcommands."""
+
+    def test_help_does_not_import_subcommand_modules(self):
+        """Test that --help loads neither the server, bridge nor docker stack."""
+        import subprocess
+        import sys
+
+        heavy = [
+            'asyncio', 'json', 'mcp', 'mgclient', 'subprocess',
+            'nvim_markdown_notes_memgraph.bridge',
+            'nvim_markdown_notes_memgraph.docker',
+            'nvim_markdown_notes_memgraph.server',
+        ]
+        script = (
+            "import sys\n"
+            "from nvim_markdown_notes_memgraph.cli import main\n"
+            "try:\n"
+            "    main(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print('loaded:' + ','.join(m for m in {heavy!r} if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.splitlines()[-1] == 'loaded:'
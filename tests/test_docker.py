@@ -0,0 +1,493 @@
+"""Tests for Docker Compose management."""
+
+import http.server
+import json
+import os
+import socketserver
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from nvim_markdown_notes_memgraph import docker
+from nvim_markdown_notes_memgraph.docker import DockerComposeError
+
+
+@pytest.fixture(autouse=True)
+def no_engine_socket(monkeypatch):
+    """Keep tests off any real docker socket; probes use the mocked CLI."""
+    monkeypatch.setenv('DOCKER_HOST', 'tcp://127.0.0.1:1')
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Serve canned Engine API responses on a unix socket.
+
+    Tests set engine.routes[path] = (status, body) and read engine.requests.
+    """
+    routes = {}
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            status, body = routes.get(self.path, (404, {'message': 'not found'}))
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def address_string(self):
+            return 'unix'
+
+        def log_message(self, *args):
+            pass
+
+    socket_path = str(tmp_path / 'docker.sock')
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    monkeypatch.setenv('DOCKER_HOST', f'unix://{socket_path}')
+
+    server.routes = routes
+    server.requests = requests
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def inspect_result(health: str, state: str = 'running') -> MagicMock:
+    """Build a fake `docker inspect` state and health result."""
+    return MagicMock(returncode=0, stdout=f"{state} {health}\n", stderr='')
+
+
+@patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', side_effect=FileNotFoundError)
+class TestWaitForHealth:
+    """Test health polling when `docker events` is unavailable (mocked)."""
+
+    @patch('nvim_markdown_notes_memgraph.docker.time.sleep')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_polls_with_exponential_backoff(self, mock_run, mock_sleep, mock_popen):
+        """Test that the delay between polls grows from 0.1s."""
+        mock_run.side_effect = [inspect_result('starting')] * 3 + [inspect_result('healthy')]
+
+        docker._wait_for_health(timeout=60)
+
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        assert delays == pytest.approx([0.1, 0.13, 0.169])
+
+    @patch('nvim_markdown_notes_memgraph.docker.time.sleep')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_backoff_resets_after_inspect_failure(self, mock_run, mock_sleep, mock_popen):
+        """Test that a failed inspect call returns to the initial delay."""
+        mock_run.side_effect = [
+            inspect_result('starting'),
+            inspect_result('starting'),
+            subprocess.CalledProcessError(1, 'docker'),
+            inspect_result('healthy'),
+        ]
+
+        docker._wait_for_health(timeout=60)
+
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        assert delays == pytest.approx([0.1, 0.13, 0.1])
+
+    @patch('nvim_markdown_notes_memgraph.docker.time.sleep')
+    @patch('nvim_markdown_notes_memgraph.docker.time.monotonic')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_times_out(self, mock_run, mock_monotonic, mock_sleep, mock_popen):
+        """Test that polling stops at the deadline."""
+        mock_run.return_value = inspect_result('starting')
+        mock_monotonic.side_effect = [0.0, 1.0, 4.95, 5.0]
+
+        with pytest.raises(DockerComposeError, match='within 5 seconds'):
+            docker._wait_for_health(timeout=5)
+
+        # Never sleeps past the deadline
+        assert mock_sleep.call_args_list[-1][0][0] == pytest.approx(0.05)
+
+    @patch('nvim_markdown_notes_memgraph.docker.time.sleep')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_stops_when_container_exits(self, mock_run, mock_sleep, mock_popen):
+        """Test that an exited container fails without waiting out the timeout."""
+        mock_run.side_effect = [
+            inspect_result('starting'),
+            inspect_result('unhealthy', state='exited'),
+        ]
+
+        with pytest.raises(DockerComposeError, match='exited'):
+            docker._wait_for_health(timeout=60)
+
+        assert mock_sleep.call_count == 1
+
+
+class TestWaitForHealthEvents:
+    """Test waiting on the `docker events` stream (mocked)."""
+
+    def fake_events(self, payload: bytes, close: bool = True) -> MagicMock:
+        """Build a fake `docker events` process streaming payload."""
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, payload)
+        if close:
+            os.close(write_fd)
+        else:
+            self.write_fd = write_fd
+        process = MagicMock()
+        process.stdout = open(read_fd, 'rb')
+        return process
+
+    def teardown_method(self):
+        if hasattr(self, 'write_fd'):
+            os.close(self.write_fd)
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_returns_on_healthy_event(self, mock_run):
+        """Test that a health_status: healthy event ends the wait."""
+        mock_run.return_value = inspect_result('starting')
+        events = self.fake_events(
+            json.dumps({'Action': 'health_status: starting'}).encode() + b'\n'
+            + json.dumps({'Action': 'health_status: healthy'}).encode() + b'\n',
+            close=False,
+        )
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events) as mock_popen:
+            docker._wait_for_health(timeout=5)
+
+        assert 'container=nvim-notes-memgraph' in mock_popen.call_args[0][0]
+        # One inspect call to catch an already-healthy container, no polling
+        assert mock_run.call_count == 1
+        events.terminate.assert_called_once()
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_already_healthy_skips_stream(self, mock_run):
+        """Test that a container healthy before the stream started is seen."""
+        mock_run.return_value = inspect_result('healthy')
+        events = self.fake_events(b'', close=False)
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events):
+            docker._wait_for_health(timeout=5)
+
+        events.terminate.assert_called_once()
+
+    @patch('nvim_markdown_notes_memgraph.docker._EVENT_RECHECK_INTERVAL', 0.01)
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_rechecks_when_stream_is_quiet(self, mock_run):
+        """Test that a healthy event missed before the CLI subscribed is caught."""
+        mock_run.side_effect = [inspect_result('starting'), inspect_result('healthy')]
+        events = self.fake_events(b'', close=False)
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events):
+            docker._wait_for_health(timeout=5)
+
+        assert mock_run.call_count == 2
+
+    @patch('nvim_markdown_notes_memgraph.docker.time.sleep')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_falls_back_to_polling_when_stream_ends(self, mock_run, mock_sleep):
+        """Test that polling takes over if `docker events` exits."""
+        mock_run.side_effect = [inspect_result('starting'), inspect_result('healthy')]
+        events = self.fake_events(b'')
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events):
+            docker._wait_for_health(timeout=5)
+
+        assert mock_run.call_count == 2
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_die_event_fails_fast(self, mock_run):
+        """Test that a die event ends the wait with an error."""
+        mock_run.return_value = inspect_result('starting')
+        events = self.fake_events(json.dumps({'Action': 'die'}).encode() + b'\n', close=False)
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events) as mock_popen:
+            with pytest.raises(DockerComposeError, match='exited'):
+                docker._wait_for_health(timeout=5)
+
+        assert 'event=die' in mock_popen.call_args[0][0]
+        events.terminate.assert_called_once()
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_times_out_without_event(self, mock_run):
+        """Test that the wait stops at the deadline when no event arrives."""
+        mock_run.return_value = inspect_result('starting')
+        events = self.fake_events(b'', close=False)
+
+        with patch('nvim_markdown_notes_memgraph.docker.subprocess.Popen', return_value=events):
+            with pytest.raises(DockerComposeError):
+                docker._wait_for_health(timeout=0.1)
+
+
+class TestGetComposeFile:
+    """Test compose file lookup."""
+
+    def setup_method(self):
+        docker._get_compose_file.cache_clear()
+
+    def teardown_method(self):
+        docker._get_compose_file.cache_clear()
+
+    def test_path_is_resolved_once(self, tmp_path):
+        """Test that repeated lookups reuse the cached path."""
+        (tmp_path / 'docker-compose.yml').write_text('services: {}\n')
+
+        with patch('nvim_markdown_notes_memgraph.docker.files', return_value=tmp_path) as mock_files:
+            first = docker._get_compose_file()
+            second = docker._get_compose_file()
+
+        assert first == second == tmp_path / 'docker-compose.yml'
+        assert mock_files.call_count == 1
+
+    def test_missing_file_is_not_cached(self, tmp_path):
+        """Test that a missing file is looked up again on the next call."""
+        with patch('nvim_markdown_notes_memgraph.docker.files', return_value=tmp_path):
+            with pytest.raises(DockerComposeError, match='not found'):
+                docker._get_compose_file()
+
+            (tmp_path / 'docker-compose.yml').write_text('services: {}\n')
+            assert docker._get_compose_file() == tmp_path / 'docker-compose.yml'
+
+
+class TestStartServices:
+    """Test start_services (mocked)."""
+
+    @pytest.fixture(autouse=True)
+    def compose_file(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('NOTES_ROOT', raising=False)
+        path = tmp_path / 'docker-compose.yml'
+        with patch.object(docker, '_get_compose_file', return_value=path):
+            yield path
+
+    @patch('nvim_markdown_notes_memgraph.docker._wait_for_health')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_waits_with_compose(self, mock_run, mock_wait):
+        """Test that health waiting is delegated to `up --wait`."""
+        docker.start_services('/notes', timeout=45)
+
+        assert mock_run.call_count == 1
+        args = mock_run.call_args[0][0]
+        assert args[-5:] == ['up', '-d', '--wait', '--wait-timeout', '45']
+        assert os.environ['NOTES_ROOT'] == '/notes'
+        assert 'env' not in mock_run.call_args[1]
+        mock_wait.assert_not_called()
+
+    @patch('nvim_markdown_notes_memgraph.docker._wait_for_health')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_falls_back_to_polling_without_wait_flag(self, mock_run, mock_wait):
+        """Test that older Compose releases fall back to polling."""
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(1, 'docker', stderr='unknown flag: --wait'),
+            MagicMock(stderr=' Container nvim-notes-memgraph  Started\n'),
+        ]
+
+        docker.start_services('/notes', timeout=45)
+
+        assert mock_run.call_args[0][0][-2:] == ['up', '-d']
+        mock_wait.assert_called_once()
+
+    @patch('nvim_markdown_notes_memgraph.docker._wait_for_health')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_fallback_skips_polling_when_up_reports_healthy(self, mock_run, mock_wait):
+        """Test that polling is skipped when `up` already saw Memgraph healthy."""
+        mock_run.side_effect = [
+            subprocess.CalledProcessError(1, 'docker', stderr='unknown flag: --wait'),
+            MagicMock(stderr=(
+                ' Container nvim-notes-memgraph  Running\n'
+                ' Container nvim-notes-memgraph  Waiting\n'
+                ' Container nvim-notes-memgraph  Healthy\n'
+                ' Container nvim-notes-mcp-server  Started\n'
+            )),
+        ]
+
+        docker.start_services('/notes')
+
+        mock_wait.assert_not_called()
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_unhealthy_services_raise(self, mock_run):
+        """Test that a failed `up --wait` is reported."""
+        mock_run.side_effect = subprocess.CalledProcessError(
+            1, 'docker', stderr='container nvim-notes-memgraph is unhealthy'
+        )
+
+        with pytest.raises(DockerComposeError, match='within 45 seconds'):
+            docker.start_services('/notes', timeout=45)
+
+    @patch('nvim_markdown_notes_memgraph.docker._wait_for_health')
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_no_wait(self, mock_run, mock_wait):
+        """Test that wait_for_health=False only starts the services."""
+        docker.start_services('/notes', wait_for_health=False)
+
+        assert mock_run.call_args[0][0][-2:] == ['up', '-d']
+        mock_wait.assert_not_called()
+
+
+class TestParsePsOutput:
+    """Test parsing of `docker compose ps --format json` output."""
+
+    SERVICES = [
+        {'Name': 'nvim-notes-memgraph', 'Service': 'memgraph', 'Health': 'healthy'},
+        {'Name': 'nvim-notes-mcp-server', 'Service': 'mcp-server', 'Health': ''},
+    ]
+
+    def test_one_object_per_line(self):
+        """Test the line-delimited output of Compose 2.21+."""
+        stdout = '\n'.join(json.dumps(s) for s in self.SERVICES) + '\n'
+        assert docker._parse_ps_output(stdout) == self.SERVICES
+
+    def test_json_array(self):
+        """Test the array output of older Compose releases."""
+        assert docker._parse_ps_output(json.dumps(self.SERVICES)) == self.SERVICES
+
+    def test_empty_output(self):
+        """Test that no running services parse to an empty list."""
+        assert docker._parse_ps_output('\n') == []
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test parsing without orjson."""
+        monkeypatch.setattr(docker, 'HAS_ORJSON', False)
+        assert docker._parse_ps_output(json.dumps(self.SERVICES[0])) == self.SERVICES[:1]
+
+    def test_invalid_output_reported(self):
+        """Test that get_status reports unparseable output."""
+        with patch.object(docker, '_get_compose_file', return_value=Path('compose.yml')), \
+                patch('nvim_markdown_notes_memgraph.docker.subprocess.run',
+                      return_value=MagicMock(stdout='not json')):
+            with pytest.raises(DockerComposeError, match='Failed to parse'):
+                docker.get_status()
+
+
+class TestStopServices:
+    """Test stop_services (mocked)."""
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_stdout_is_discarded(self, mock_run):
+        """Test that `down` output is not captured, only stderr."""
+        with patch.object(docker, '_get_compose_file', return_value=Path('compose.yml')):
+            docker.stop_services()
+
+        kwargs = mock_run.call_args[1]
+        assert kwargs['stdout'] is subprocess.DEVNULL
+        assert kwargs['stderr'] is subprocess.PIPE
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_failure_reports_stderr(self, mock_run):
+        """Test that a failed `down` includes Compose's error output."""
+        mock_run.side_effect = subprocess.CalledProcessError(1, 'docker', stderr='boom')
+
+        with patch.object(docker, '_get_compose_file', return_value=Path('compose.yml')):
+            with pytest.raises(DockerComposeError, match='boom'):
+                docker.stop_services()
+
+
+class TestIsHealthy:
+    """Test is_healthy (mocked)."""
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_healthy(self, mock_run):
+        """Test that the Memgraph container is inspected by name."""
+        mock_run.return_value = inspect_result('healthy')
+
+        assert docker.is_healthy() == (True, "Services are healthy")
+        command = mock_run.call_args[0][0]
+        assert command[:2] == ['docker', 'inspect']
+        assert command[-1] == 'nvim-notes-memgraph'
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_memgraph_missing(self, mock_run):
+        """Test the message when the container does not exist."""
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout='', stderr='Error: No such object: nvim-notes-memgraph'
+        )
+
+        assert docker.is_healthy() == (False, "Memgraph service not found")
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_memgraph_not_running(self, mock_run):
+        """Test the message for a stopped Memgraph container."""
+        mock_run.return_value = inspect_result('unhealthy', state='exited')
+
+        healthy, message = docker.is_healthy()
+        assert healthy is False
+        assert 'state: exited' in message
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_daemon_error(self, mock_run):
+        """Test that other inspect failures are reported."""
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout='', stderr='Cannot connect to the Docker daemon'
+        )
+
+        healthy, message = docker.is_healthy()
+        assert healthy is False
+        assert 'Cannot connect' in message
+
+
+class TestEngineApi:
+    """Test health probes through the Engine API socket."""
+
+    CONTAINER_PATH = '/containers/nvim-notes-memgraph/json'
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_healthy_without_cli(self, mock_run, engine):
+        """Test that a reachable socket answers without running docker."""
+        engine.routes[self.CONTAINER_PATH] = (
+            200, {'State': {'Status': 'running', 'Health': {'Status': 'healthy'}}}
+        )
+
+        assert docker.is_healthy() == (True, "Services are healthy")
+        assert engine.requests == [self.CONTAINER_PATH]
+        mock_run.assert_not_called()
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_missing_container_is_confirmed_by_cli(self, mock_run, engine):
+        """Test that a socket 404 defers to docker inspect."""
+        mock_run.return_value = MagicMock(
+            returncode=1, stdout='', stderr='Error: No such object: nvim-notes-memgraph'
+        )
+
+        assert docker.is_healthy() == (False, "Memgraph service not found")
+        assert engine.requests == [self.CONTAINER_PATH]
+        assert mock_run.call_args[0][0][:2] == ['docker', 'inspect']
+
+    @pytest.mark.parametrize("status,body", [(500, {'message': 'boom'}), (200, 'not json')])
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_unusable_answer_falls_back_to_cli(self, mock_run, engine, status, body):
+        """Test that errors and bodies without a State fall back to the CLI."""
+        engine.routes[self.CONTAINER_PATH] = (status, body)
+        mock_run.return_value = inspect_result('healthy')
+
+        assert docker.is_healthy() == (True, "Services are healthy")
+        assert mock_run.call_args[0][0][:2] == ['docker', 'inspect']
+
+    def test_socket_needs_explicit_unix_docker_host(self, monkeypatch):
+        """Test that the CLI's context resolution is used unless DOCKER_HOST is unix."""
+        monkeypatch.delenv('DOCKER_HOST')
+        assert docker._docker_socket_path() is None
+
+        monkeypatch.setenv('DOCKER_HOST', 'unix:///run/user/1000/docker.sock')
+        assert docker._docker_socket_path() == '/run/user/1000/docker.sock'
+
+        # No unix sockets (Windows): always use the CLI
+        monkeypatch.delattr(docker.socket, 'AF_UNIX')
+        assert docker._docker_socket_path() is None
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_no_healthcheck(self, mock_run, engine):
+        """Test a running container that reports no health status."""
+        engine.routes[self.CONTAINER_PATH] = (200, {'State': {'Status': 'running'}})
+
+        assert docker._inspect_memgraph() == ('running', '')
+
+    @patch('nvim_markdown_notes_memgraph.docker.subprocess.run')
+    def test_falls_back_to_cli_without_socket(self, mock_run, tmp_path, monkeypatch):
+        """Test that an unreachable socket falls back to docker inspect."""
+        monkeypatch.setenv('DOCKER_HOST', f'unix://{tmp_path}/missing.sock')
+        mock_run.return_value = inspect_result('healthy')
+
+        assert docker.is_healthy() == (True, "Services are healthy")
+        assert mock_run.call_args[0][0][:2] == ['docker', 'inspect']
@@ -1,237 +1,169 @@
 """Tests for MCP server functionality."""
 
+import json
 import os
-import tempfile
+import re
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, PropertyMock
 
 import pytest
 
 from nvim_markdown_notes_memgraph import entities
+from nvim_markdown_notes_memgraph import server as server_module
 from nvim_markdown_notes_memgraph.server import MemgraphNotesServer
 
 
-class TestEntityExtraction:
-    """Test entity extraction functions."""
+# Sample notes shared by the tests that read files; none of them write
+SAMPLE_NOTES = {
+    "meeting.md": (
+        "# Meeting Notes\n"
+        "Met with @alice about [[project-alpha]].\n"
+        "Topics: #tech #ops\n"
+        "Follow up with @bob-smith.\n"
+    ),
+    "empty.md": "",
+    "heading.md": "# My Title\nSome content.\n",
+    "no-heading.md": "Just some content without a heading.\n",
+    "entities.md": "# Test\n[[link]] @mention #tag",
+}
+
+
+@pytest.fixture(scope="session")
+def sample_notes(tmp_path_factory):
+    """Directory holding SAMPLE_NOTES, written once per test session."""
+    notes = tmp_path_factory.mktemp("notes")
+    for name, content in SAMPLE_NOTES.items():
+        (notes / name).write_text(content)
+    return notes
+
+
+@pytest.fixture
+def connected_server():
+    """A server connected to a mocked Memgraph, with the cursor it queries."""
+    with patch('nvim_markdown_notes_memgraph.server.mgclient') as mock_mgclient:
+        mock_cursor = MagicMock()
+        mock_mgclient.connect.return_value.cursor.return_value = mock_cursor
+        server = MemgraphNotesServer()
+        server.connect()
+        yield server, mock_cursor
 
-    def test_extract_wikilinks_single(self):
-        """Test extracting a single wikilink."""
-        line = "This is a [[note]] reference."
-        result = entities.extract_wikilinks(line, 1, "/notes")
 
-        assert len(result) == 1
-        assert result[0]['target'] == 'note'
-        assert result[0]['target_path'] == '/notes/note.md'
-        assert result[0]['line_number'] == 1
+class TestEntityExtraction:
+    """Test entity extraction functions."""
 
-    def test_extract_wikilinks_multiple(self):
-        """Test extracting multiple wikilinks from one line."""
-        line = "See [[first]] and [[second]] for details."
+    @pytest.mark.parametrize("line,expected", [
+        pytest.param("This is a [[note]] reference.", ['note'], id="single"),
+        pytest.param("See [[first]] and [[second]] for details.", ['first', 'second'],
+                     id="multiple"),
+        pytest.param("See [[actual-note|display name]].", ['actual-note'], id="alias"),
+        pytest.param("This is just plain text.", [], id="none"),
+    ])
+    def test_extract_wikilinks(self, line, expected):
+        """Test extracting wikilinks, including [[target|alias]] links."""
         result = entities.extract_wikilinks(line, 2, "/notes")
 
-        assert len(result) == 2
-        assert result[0]['target'] == 'first'
-        assert result[1]['target'] == 'second'
-        assert result[0]['line_number'] == 2
-        assert result[1]['line_number'] == 2
-
-    def test_extract_wikilinks_with_alias(self):
-        """Test extracting wikilink with alias [[target|alias]]."""
-        line = "See [[actual-note|display name]]."
-        result = entities.extract_wikilinks(line, 1, "/notes")
-
-        assert len(result) == 1
-        assert result[0]['target'] == 'actual-note'
-        assert result[0]['target_path'] == '/notes/actual-note.md'
-
-    def test_extract_wikilinks_none(self):
-        """Test line with no wikilinks."""
-        line = "This is just plain text."
-        result = entities.extract_wikilinks(line, 1, "/notes")
-
-        assert len(result) == 0
-
-    def test_extract_mentions_single(self):
-        """Test extracting a single @mention."""
-        line = "Meet with @alice tomorrow."
-        result = entities.extract_mentions(line, 1)
-
-        assert len(result) == 1
-        assert result[0]['name'] == 'alice'
-        assert result[0]['line_number'] == 1
-
-    def test_extract_mentions_multiple(self):
-        """Test extracting multiple mentions."""
-        line = "Meeting with @alice and @bob-smith."
+        assert [link['target'] for link in result] == expected
+        assert [link['target_path'] for link in result] == [
+            f"/notes/{target}.md" for target in expected
+        ]
+        assert all(link['line_number'] == 2 for link in result)
+
+    @pytest.mark.parametrize("line,expected", [
+        pytest.param("Meet with @alice tomorrow.", ['alice'], id="single"),
+        pytest.param("Meeting with @alice and @bob-smith.", ['alice', 'bob-smith'],
+                     id="multiple"),
+        pytest.param("Mention @john-doe and @jane_smith.", ['john-doe', 'jane_smith'],
+                     id="hyphen-underscore"),
+        # Email addresses and bare email domains are not mentions
+        pytest.param("Contact alice@example.com for details.", [], id="email"),
+        pytest.param("Emails: @example.com, @test.org, @demo.io, @sample.co", [],
+                     id="email-tlds"),
+    ])
+    def test_extract_mentions(self, line, expected):
+        """Test extracting @mentions."""
         result = entities.extract_mentions(line, 3)
 
-        assert len(result) == 2
-        assert result[0]['name'] == 'alice'
-        assert result[1]['name'] == 'bob-smith'
-        assert result[0]['line_number'] == 3
-        assert result[1]['line_number'] == 3
-
-    def test_extract_mentions_skip_email(self):
-        """Test that email addresses are not extracted as mentions."""
-        line = "Contact alice@example.com for details."
-        result = entities.extract_mentions(line, 1)
-
-        # Should filter out email
-        assert len(result) == 0
-
-    def test_extract_mentions_skip_email_variations(self):
-        """Test filtering various email TLDs."""
-        line = "Emails: @example.com, @test.org, @demo.io, @sample.co"
-        result = entities.extract_mentions(line, 1)
-
-        # All should be filtered as emails
-        assert len(result) == 0
-
-    def test_extract_mentions_hyphen_underscore(self):
-        """Test mentions with hyphens and underscores."""
-        line = "Mention @john-doe and @jane_smith."
-        result = entities.extract_mentions(line, 1)
-
-        assert len(result) == 2
-        assert result[0]['name'] == 'john-doe'
-        assert result[1]['name'] == 'jane_smith'
-
-    def test_extract_hashtags_single(self):
-        """Test extracting a single hashtag."""
-        line = "This is about #project."
+        assert [mention['name'] for mention in result] == expected
+        assert all(mention['line_number'] == 3 for mention in result)
+
+    @pytest.mark.parametrize("line,expected", [
+        pytest.param("This is about #project.", ['project'], id="single"),
+        pytest.param("Topics: #tech #ops #meeting", ['tech', 'ops', 'meeting'], id="multiple"),
+        # EXCLUDED_HASHTAGS match whole tags only
+        pytest.param("See #gid #browse #edit #resource for links.", [], id="excluded"),
+        pytest.param("Tags: #project #gid #meeting #browse", ['project', 'meeting'],
+                     id="mixed-excluded"),
+        pytest.param("#gid-notes #editing #resources #edit #Gid",
+                     ['gid-notes', 'editing', 'resources', 'Gid'], id="excluded-prefix"),
+        # A '#' right after '/' or '=' is a URL fragment or a hex colour
+        pytest.param("Visit https://example.com/#section for details.", [],
+                     id="url-fragment"),
+        pytest.param("Color is background=#000000", [], id="hex-color"),
+    ])
+    def test_extract_hashtags(self, line, expected):
+        """Test extracting hashtags."""
         result = entities.extract_hashtags(line, 1)
 
-        assert len(result) == 1
-        assert result[0]['name'] == 'project'
-        assert result[0]['line_number'] == 1
-
-    def test_extract_hashtags_multiple(self):
-        """Test extracting multiple hashtags."""
-        line = "Topics: #tech #ops #meeting"
-        result = entities.extract_hashtags(line, 2)
-
-        assert len(result) == 3
-        assert result[0]['name'] == 'tech'
-        assert result[1]['name'] == 'ops'
-        assert result[2]['name'] == 'meeting'
-
-    def test_extract_hashtags_exclude_false_positives(self):
-        """Test that excluded hashtags are filtered out."""
-        line = "See #gid #browse #edit #resource for links."
-        result = entities.extract_hashtags(line, 1)
+        assert [tag['name'] for tag in result] == expected
+        assert all(tag['line_number'] == 1 for tag in result)
 
-        # All are in EXCLUDED_HASHTAGS
-        assert len(result) == 0
+    def test_patterns_are_compiled_once(self):
+        """Test that extraction uses patterns compiled at import."""
+        for pattern in (entities.WIKILINK_PATTERN, entities.MENTION_PATTERN,
+                        entities.HASHTAG_PATTERN, entities.ENTITY_PATTERN,
+                        entities.HEADING_PREFIX_PATTERN):
+            assert isinstance(pattern, re.Pattern)
 
-    def test_extract_hashtags_skip_url_fragments(self):
-        """Test that URL fragments after / are filtered by negative lookbehind."""
-        line = "Visit https://example.com/#section for details."
-        result = entities.extract_hashtags(line, 1)
-
-        # The negative lookbehind (?<![/=]) filters out #section after /
-        assert len(result) == 0
+    def test_extract_from_file_complete(self, sample_notes):
+        """Test extracting all entities from a markdown file."""
+        path = str(sample_notes / "meeting.md")
+        result = entities.extract_from_file(path, str(sample_notes))
 
-    def test_extract_hashtags_skip_hex_color_with_equals(self):
-        """Test that hex colors after = are filtered by negative lookbehind."""
-        line = "Color is background=#000000"
-        result = entities.extract_hashtags(line, 1)
+        assert result['path'] == path
+        assert result['title'] == 'Meeting Notes'
+        assert '# Meeting Notes' in result['content']
 
-        # The negative lookbehind (?<![/=]) filters out #000000 after =
-        assert len(result) == 0
+        # Check wikilinks
+        assert len(result['wikilinks']) == 1
+        assert result['wikilinks'][0]['target'] == 'project-alpha'
+        assert result['wikilinks'][0]['line_number'] == 2
 
-    def test_extract_hashtags_mixed_valid_invalid(self):
-        """Test line with both valid hashtags and excluded ones."""
-        line = "Tags: #project #gid #meeting #browse"
-        result = entities.extract_hashtags(line, 1)
+        # Check mentions
+        assert len(result['mentions']) == 2
+        mention_names = [m['name'] for m in result['mentions']]
+        assert 'alice' in mention_names
+        assert 'bob-smith' in mention_names
 
-        # Only project and meeting should be extracted
-        assert len(result) == 2
-        names = [tag['name'] for tag in result]
-        assert 'project' in names
-        assert 'meeting' in names
-        assert 'gid' not in names
-        assert 'browse' not in names
+        # Check hashtags
+        assert len(result['hashtags']) == 2
+        hashtag_names = [h['name'] for h in result['hashtags']]
+        assert 'tech' in hashtag_names
+        assert 'ops' in hashtag_names
 
-    def test_extract_from_file_complete(self):
-        """Test extracting all entities from a markdown file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write("# Meeting Notes\n")
-            f.write("Met with @alice about [[project-alpha]].\n")
-            f.write("Topics: #tech #ops\n")
-            f.write("Follow up with @bob-smith.\n")
-            temp_path = f.name
-
-        try:
-            notes_root = os.path.dirname(temp_path)
-            result = entities.extract_from_file(temp_path, notes_root)
-
-            assert result['path'] == temp_path
-            assert result['title'] == 'Meeting Notes'
-            assert '# Meeting Notes' in result['content']
-
-            # Check wikilinks
-            assert len(result['wikilinks']) == 1
-            assert result['wikilinks'][0]['target'] == 'project-alpha'
-            assert result['wikilinks'][0]['line_number'] == 2
-
-            # Check mentions
-            assert len(result['mentions']) == 2
-            mention_names = [m['name'] for m in result['mentions']]
-            assert 'alice' in mention_names
-            assert 'bob-smith' in mention_names
-
-            # Check hashtags
-            assert len(result['hashtags']) == 2
-            hashtag_names = [h['name'] for h in result['hashtags']]
-            assert 'tech' in hashtag_names
-            assert 'ops' in hashtag_names
-        finally:
-            os.unlink(temp_path)
-
-    def test_extract_from_file_empty(self):
+    def test_extract_from_file_empty(self, sample_notes):
         """Test extracting from empty file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            temp_path = f.name
-
-        try:
-            result = entities.extract_from_file(temp_path)
+        path = str(sample_notes / "empty.md")
+        result = entities.extract_from_file(path)
 
-            assert result['path'] == temp_path
-            assert result['content'] == ''
-            assert result['wikilinks'] == []
-            assert result['mentions'] == []
-            assert result['hashtags'] == []
-        finally:
-            os.unlink(temp_path)
+        assert result['path'] == path
+        assert result['content'] == ''
+        assert result['wikilinks'] == []
+        assert result['mentions'] == []
+        assert result['hashtags'] == []
 
-    def test_extract_from_file_title_from_heading(self):
+    def test_extract_from_file_title_from_heading(self, sample_notes):
         """Test that title is extracted from first heading."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write("# My Title\n")
-            f.write("Some content.\n")
-            temp_path = f.name
-
-        try:
-            result = entities.extract_from_file(temp_path)
+        result = entities.extract_from_file(str(sample_notes / "heading.md"))
 
-            # Should strip the '# ' prefix
-            assert result['title'] == 'My Title'
-        finally:
-            os.unlink(temp_path)
+        # Should strip the '# ' prefix
+        assert result['title'] == 'My Title'
 
-    def test_extract_from_file_title_from_first_line(self):
+    def test_extract_from_file_title_from_first_line(self, sample_notes):
         """Test that title is extracted from first line if no heading."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write("Just some content without a heading.\n")
-            temp_path = f.name
+        result = entities.extract_from_file(str(sample_notes / "no-heading.md"))
 
-        try:
-            result = entities.extract_from_file(temp_path)
-
-            # Should use first line as title
-            assert result['title'] == 'Just some content without a heading.'
-        finally:
-            os.unlink(temp_path)
+        # Should use first line as title
+        assert result['title'] == 'Just some content without a heading.'
 
     def test_extract_from_file_nonexistent(self):
         """Test extracting from nonexistent file."""
@@ -243,6 +175,36 @@ class TestEntityExtraction:
         assert result['mentions'] == []
         assert result['hashtags'] == []
 
+    def test_extract_from_content_matches_per_line_extraction(self):
+        """Test that the single-pass scan agrees with the per-line functions."""
+        content = (
+            "# Title #heading\n"
+            "See [[note-a]] and [[sub/note-b|Alias]] with @alice\n"
+            "Mail bob@example.com or @carol@host, tags #x #gid a/#no b=#no\n"
+            "Inside a link: [[meet @dave #topic]] then #after\n"
+            "Absolute [[/elsewhere/note]] link\n"
+            "Unclosed [[broken\n"
+            "link]] stays unmatched, @eve.io is an email, @frank_2-x ok\n"
+            "\n"
+            "#last"
+        )
+
+        expected = {'wikilinks': [], 'mentions': [], 'hashtags': []}
+        for line_num, line in enumerate(content.split('\n'), 1):
+            expected['wikilinks'].extend(
+                entities.extract_wikilinks(line, line_num, "/notes"))
+            expected['mentions'].extend(entities.extract_mentions(line, line_num))
+            expected['hashtags'].extend(entities.extract_hashtags(line, line_num))
+
+        result = entities.extract_from_content(content, "/notes")
+
+        assert result == expected
+        for root in ("", "/notes/"):
+            line = "[[a]] [[b/c]]"
+            assert (entities.extract_from_content(line, root)['wikilinks']
+                    == entities.extract_wikilinks(line, 1, root))
+        assert [m['name'] for m in result['mentions']] == ['alice', 'host', 'dave', 'frank_2-x']
+
 
 class TestMemgraphNotesServer:
     """Test MemgraphNotesServer class methods."""
@@ -268,22 +230,14 @@ class TestMemgraphNotesServer:
         assert server.port == 9999
         assert server.notes_root == "/custom/notes"
 
-    def test_read_note_content_existing_file(self):
+    def test_read_note_content_existing_file(self, sample_notes):
         """Test reading content from existing note."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write("# Test Note\nSome content.")
-            temp_path = f.name
+        server = MemgraphNotesServer(notes_root=str(sample_notes))
 
-        try:
-            notes_root = os.path.dirname(temp_path)
-            server = MemgraphNotesServer(notes_root=notes_root)
+        content = server.read_note_content(str(sample_notes / "heading.md"))
 
-            content = server.read_note_content(temp_path)
-
-            assert "# Test Note" in content
-            assert "Some content." in content
-        finally:
-            os.unlink(temp_path)
+        assert "# My Title" in content
+        assert "Some content." in content
 
     def test_read_note_content_nonexistent_file(self):
         """Test reading content from nonexistent file."""
@@ -293,66 +247,363 @@ class TestMemgraphNotesServer:
 
         assert "Note not found" in content
 
-    def test_read_note_content_relative_path(self):
+    def test_read_note_content_relative_path(self, tmp_path):
         """Test reading content with relative path."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create a note in temporary directory
-            note_path = os.path.join(tmpdir, 'test.md')
-            with open(note_path, 'w') as f:
-                f.write("Test content")
+        (tmp_path / 'test.md').write_text("Test content")
 
-            server = MemgraphNotesServer(notes_root=tmpdir)
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
 
-            # Read with relative path
-            content = server.read_note_content('test.md')
+        # Read with relative path
+        content = server.read_note_content('test.md')
 
-            assert "Test content" in content
+        assert "Test content" in content
 
-    def test_extract_from_file_delegates_to_entities(self):
+    def test_extract_from_file_delegates_to_entities(self, sample_notes):
         """Test that extract_from_file delegates to entities module."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as f:
-            f.write("# Test\n[[link]] @mention #tag")
-            temp_path = f.name
-
-        try:
-            notes_root = os.path.dirname(temp_path)
-            server = MemgraphNotesServer(notes_root=notes_root)
+        server = MemgraphNotesServer(notes_root=str(sample_notes))
 
-            result = server.extract_from_file(temp_path)
+        result = server.extract_from_file(str(sample_notes / "entities.md"))
 
-            # Should return same structure as entities.extract_from_file
-            assert 'path' in result
-            assert 'title' in result
-            assert 'wikilinks' in result
-            assert 'mentions' in result
-            assert 'hashtags' in result
+        # Should return same structure as entities.extract_from_file
+        assert 'path' in result
+        assert 'title' in result
+        assert 'wikilinks' in result
+        assert 'mentions' in result
+        assert 'hashtags' in result
 
-            assert len(result['wikilinks']) == 1
-            assert len(result['mentions']) == 1
-            assert len(result['hashtags']) == 1
-        finally:
-            os.unlink(temp_path)
+        assert len(result['wikilinks']) == 1
+        assert len(result['mentions']) == 1
+        assert len(result['hashtags']) == 1
 
 
 class TestMemgraphServerQueryBuilding:
     """Test query building for Memgraph operations (mocked)."""
 
+    @patch('nvim_markdown_notes_memgraph.server.time.monotonic')
     @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_backlinks_query_structure(self, mock_mgclient):
-        """Test that get_backlinks builds correct query."""
-        # Create mock connection and cursor
+    def test_read_methods_are_cached_briefly(self, mock_mgclient, mock_monotonic):
+        """Test that repeated reads hit the cache until it expires or is cleared."""
         mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-        mock_cursor.fetchall.return_value = [
-            ['/notes/source1.md', 'Source One', 10],
-            ['/notes/source2.md', 'Source Two', 20]
+        mock_cursor = mock_conn.cursor.return_value
+        # Rows wide enough for both get_all_tags and find_by_tag
+        mock_cursor.fetchall.return_value = [['project', 3, 1]]
+        mock_mgclient.connect.return_value = mock_conn
+        mock_monotonic.return_value = 100.0
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        def tag_queries():
+            return sum('HAS_TAG' in c[0][0] for c in mock_cursor.execute.call_args_list)
+
+        assert server.get_all_tags() == [{"name": "project", "count": 3}]
+        assert server.get_all_tags() == [{"name": "project", "count": 3}]
+        assert tag_queries() == 1
+
+        # Different arguments are cached separately
+        server.find_by_tag('project')
+        assert tag_queries() == 2
+
+        mock_monotonic.return_value = 100.0 + 11
+        server.get_all_tags()
+        assert tag_queries() == 3
+
+        server.clear_cache()
+        server.get_all_tags()
+        assert tag_queries() == 4
+        assert server.cache_stats()["hits"] == 1
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_read_overlapping_clear_is_not_cached(self, mock_mgclient):
+        """Test that a read which started before clear_cache() is not stored."""
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        def stale_rows():
+            # A reindex finishes while the read is still in flight
+            server.clear_cache()
+            return [['stale', 1]]
+
+        mock_cursor.fetchall.side_effect = lambda: (
+            stale_rows() if mock_cursor.fetchall.call_count == 1 else [['fresh', 1]]
+        )
+
+        assert server.get_all_tags() == [{"name": "stale", "count": 1}]
+        assert server.get_all_tags() == [{"name": "fresh", "count": 1}]
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_concurrent_reindexes_run_one_at_a_time(self, mock_mgclient, tmp_path):
+        """Test that two reindexes started together never overlap."""
+        import threading
+        import time
+
+        (tmp_path / "note.md").write_text("# Note\n")
+
+        def new_conn(**kwargs):
+            conn = MagicMock()
+            conn.cursor.return_value.fetchall.return_value = []
+            return conn
+        mock_mgclient.connect.side_effect = new_conn
+
+        active, peak = [0], [0]
+        counter_lock = threading.Lock()
+        extract = entities.extract_from_file
+
+        def slow_extract(*args):
+            with counter_lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with counter_lock:
+                active[0] -= 1
+            return extract(*args)
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        results = []
+        with patch.object(entities, 'extract_from_file', side_effect=slow_extract):
+            threads = [
+                threading.Thread(target=lambda: results.append(server.reindex_all_notes()))
+                for _ in range(2)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert peak[0] == 1
+        assert [r["indexed"] for r in results] == [1, 1]
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_reindex_commits_in_batches(self, mock_mgclient, tmp_path, monkeypatch):
+        """Test that reindexing writes notes in explicit transactions."""
+        for i in range(5):
+            (tmp_path / f"note{i}.md").write_text(f"# Note {i}\n")
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.fetchall.return_value = []
+        mock_mgclient.connect.return_value = mock_conn
+        monkeypatch.setattr('nvim_markdown_notes_memgraph.server.REINDEX_BATCH_SIZE', 2)
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        result = server.reindex_all_notes()
+
+        assert result == {
+            "indexed": 5, "unchanged": 0, "removed": 0, "total": 5, "errors": []
+        }
+        # Batches of 2, 2 and 1
+        assert mock_conn.commit.call_count == 3
+        assert mock_conn.autocommit is True
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_reindex_only_rewrites_changed_notes(self, mock_mgclient, tmp_path):
+        """Test that incremental reindex skips unchanged notes and removes deleted ones."""
+        from nvim_markdown_notes_memgraph.server import _content_hash
+
+        same = tmp_path / "same.md"
+        same.write_text("# Same\n")
+        changed = tmp_path / "changed.md"
+        changed.write_text("# Changed\n#new-tag\n")
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+
+        def execute(cypher, params=None):
+            if 'RETURN n.path, n.content_hash' in cypher:
+                mock_cursor.fetchall.return_value = [
+                    [str(same), _content_hash("# Same\n"), None],
+                    [str(changed), "old-hash", None],
+                    [str(tmp_path / "gone.md"), "gone-hash", None],
+                ]
+            else:
+                mock_cursor.fetchall.return_value = []
+        mock_cursor.execute.side_effect = execute
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        result = server.reindex_all_notes()
+
+        assert result == {
+            "indexed": 1, "unchanged": 1, "removed": 1, "total": 2, "errors": []
+        }
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert not any('DETACH DELETE' in q for q in queries)
+        note_writes = [c[0] for c in mock_cursor.execute.call_args_list
+                       if 'MERGE (n:Note {path: $path})' in c[0][0]]
+        # Only the changed note is written, replacing its old relationships
+        assert [params['path'] for _, params in note_writes] == [str(changed)]
+        assert 'DELETE r' in note_writes[0][0]
+        removal = next(c[0] for c in mock_cursor.execute.call_args_list
+                       if 'UNWIND $paths' in c[0][0])
+        assert removal[1] == {"paths": [str(tmp_path / "gone.md")]}
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_reindex_skips_reading_files_with_unchanged_mtime(self, mock_mgclient, tmp_path):
+        """Test that files are only read when their mtime changed since indexing."""
+        from nvim_markdown_notes_memgraph.server import _content_hash
+
+        old_ns = 1_600_000_000 * 10**9
+        untouched = tmp_path / "untouched.md"
+        untouched.write_text("# Untouched\n")
+        touched = tmp_path / "touched.md"
+        touched.write_text("# Touched\n")
+        recent = tmp_path / "recent.md"
+        recent.write_text("# Recent\n")
+        os.utime(untouched, ns=(old_ns, old_ns))
+        os.utime(touched, ns=(old_ns + 1, old_ns + 1))
+
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+
+        def execute(cypher, params=None):
+            if 'RETURN n.path, n.content_hash' in cypher:
+                mock_cursor.fetchall.return_value = [
+                    [str(untouched), "hash-not-checked", old_ns],
+                    [str(touched), _content_hash("# Touched\n"), old_ns],
+                ]
+            else:
+                mock_cursor.fetchall.return_value = []
+        mock_cursor.execute.side_effect = execute
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        with patch.object(entities, 'extract_from_file', wraps=entities.extract_from_file) as extract:
+            result = server.reindex_all_notes()
+
+        read = [c[0][0] for c in extract.call_args_list]
+        assert sorted(read) == sorted([str(touched), str(recent)])
+        assert result == {
+            "indexed": 1, "unchanged": 2, "removed": 0, "total": 3, "errors": []
+        }
+        calls = mock_cursor.execute.call_args_list
+        # Touched but identical: only the new mtime is recorded
+        mtime_update = next(c[0][1] for c in calls if 'SET n.mtime_ns = row.mtime_ns' in c[0][0])
+        assert mtime_update == {"rows": [{"path": str(touched), "mtime_ns": old_ns + 1}]}
+        # Just written: the mtime is not trusted yet
+        note_write = next(c[0][1] for c in calls if 'MERGE (n:Note {path: $path})' in c[0][0])
+        assert note_write['path'] == str(recent)
+        assert note_write['mtime_ns'] is None
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_full_reindex_clears_graph(self, mock_mgclient, tmp_path):
+        """Test that full=True clears the graph and rewrites every note."""
+        (tmp_path / "a.md").write_text("# A\n")
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        result = server.reindex_all_notes(full=True)
+
+        queries = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert "MATCH (n) DETACH DELETE n" in queries
+        assert not any('RETURN n.path, n.content_hash' in q for q in queries)
+        assert result['indexed'] == 1
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_reindex_isolates_failing_note(self, mock_mgclient, tmp_path):
+        """Test that one bad note is reported without dropping its batch."""
+        for name in ("a", "bad", "c"):
+            (tmp_path / f"{name}.md").write_text(f"# {name}\n")
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+
+        def execute(cypher, params=None):
+            if params and params.get('path', '').endswith('bad.md'):
+                raise Exception("write failed")
+        mock_cursor.execute.side_effect = execute
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        result = server.reindex_all_notes()
+
+        assert result['indexed'] == 2
+        assert result['errors'] == [
+            {"path": str(tmp_path / "bad.md"), "error": "write failed"}
         ]
+        # The failed batch, then the bad note on its own
+        assert mock_conn.rollback.call_count == 2
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_reindex_drops_connection_it_cannot_restore(self, mock_mgclient, tmp_path):
+        """Test that a failed autocommit restore does not mask the reindex error."""
+        (tmp_path / "a.md").write_text("# A\n")
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+
+        def execute(cypher, params=None):
+            if params and 'path' in params:
+                raise Exception("connection lost")
+        mock_cursor.execute.side_effect = execute
+        mock_conn.rollback.side_effect = RuntimeError("rollback failed")
+
+        def autocommit(*value):
+            if value == (True,):
+                raise RuntimeError("cannot change autocommit")
+        type(mock_conn).autocommit = PropertyMock(side_effect=autocommit)
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        server.connect()
+        with pytest.raises(RuntimeError, match="rollback failed"):
+            server.reindex_all_notes()
+
+        # The next query() reconnects instead of reusing the broken connection
+        assert server.connection is None
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_index_note_batches_relationships(self, mock_mgclient):
+        """Test that _index_note writes each relationship type in one query."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
         mock_conn.cursor.return_value = mock_cursor
         mock_mgclient.connect.return_value = mock_conn
 
-        server = MemgraphNotesServer()
+        server = MemgraphNotesServer(notes_root='/notes')
         server.connect()
 
+        server._index_note({
+            'path': '/notes/a.md',
+            'title': 'A',
+            'content': '...',
+            'wikilinks': [
+                {'target': 'b', 'target_path': '/notes/b.md', 'line_number': 1},
+                {'target': 'c', 'target_path': '/notes/c.md', 'line_number': 2},
+                {'target': 'd', 'target_path': '/notes/d.md', 'line_number': 2},
+            ],
+            'mentions': [{'name': 'alice', 'line_number': 3}],
+            'hashtags': [],
+        })
+
+        writes = [c for c in mock_cursor.execute.call_args_list if c[0][0] != "RETURN 1"]
+        # Note, links and mentions; no query for the empty tag list
+        assert len(writes) == 3
+        link_query, link_params = writes[1][0]
+        assert 'UNWIND $rows' in link_query and 'LINKS_TO' in link_query
+        assert link_params['source_path'] == '/notes/a.md'
+        assert [row['target_path'] for row in link_params['rows']] == [
+            '/notes/b.md', '/notes/c.md', '/notes/d.md'
+        ]
+        assert writes[2][0][1]['rows'] == [{'name': 'alice', 'line_number': 3}]
+
+    def test_get_backlinks_query_structure(self, connected_server):
+        """Test that get_backlinks builds correct query."""
+        server, mock_cursor = connected_server
+        mock_cursor.fetchall.return_value = [
+            ['/notes/source1.md', 'Source One', 10],
+            ['/notes/source2.md', 'Source Two', 20]
+        ]
+
         results = server.get_backlinks('/notes/target.md')
 
         # Verify cursor.execute was called
@@ -373,17 +624,10 @@ class TestMemgraphServerQueryBuilding:
         assert results[0]['title'] == 'Source One'
         assert results[0]['line'] == 10
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_find_by_tag_strips_hash_prefix(self, mock_mgclient):
+    def test_find_by_tag_strips_hash_prefix(self, connected_server):
         """Test that find_by_tag strips # prefix."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = []
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         # Call with # prefix
         server.find_by_tag('#project')
@@ -392,18 +636,13 @@ class TestMemgraphServerQueryBuilding:
         call_args = mock_cursor.execute.call_args
         params = call_args[0][1]
         assert params['tag'] == 'project'
+        # The lookup starts from the Tag(name) index
+        assert call_args[0][0].strip().startswith('USING INDEX :Tag(name)')
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_find_by_mention_strips_at_prefix(self, mock_mgclient):
+    def test_find_by_mention_strips_at_prefix(self, connected_server):
         """Test that find_by_mention strips @ prefix."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = []
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         # Call with @ prefix
         server.find_by_mention('@alice')
@@ -413,19 +652,12 @@ class TestMemgraphServerQueryBuilding:
         params = call_args[0][1]
         assert params['person'] == 'alice'
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_related_returns_structured_data(self, mock_mgclient):
+    def test_get_related_returns_structured_data(self, connected_server):
         """Test that get_related returns properly structured data."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = [
             ['/notes/related.md', 'Related Note', 3, ['Tag: project', 'Person: alice']]
         ]
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         results = server.get_related('/notes/source.md')
 
@@ -435,11 +667,9 @@ class TestMemgraphServerQueryBuilding:
         assert results[0]['shared_count'] == 3
         assert results[0]['connections'] == ['Tag: project', 'Person: alice']
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_note_context_complete_structure(self, mock_mgclient):
+    def test_get_note_context_complete_structure(self, connected_server):
         """Test that get_note_context returns complete structure."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = [
             [
                 'My Note',                                      # title
@@ -450,11 +680,6 @@ class TestMemgraphServerQueryBuilding:
                 [{'path': '/notes/back1.md', 'title': 'Back 1'}]   # backlinks
             ]
         ]
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         result = server.get_note_context('/notes/my-note.md')
 
@@ -465,31 +690,17 @@ class TestMemgraphServerQueryBuilding:
         assert len(result['mentions']) == 2
         assert len(result['backlinks']) == 1
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_graph_stats_returns_dict(self, mock_mgclient):
-        """Test that get_graph_stats returns statistics dict."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
-
-        # Each query() calls is_connected() first, then the actual query
-        # So we need to mock fetchall to return values for both
-        # Use a simple counter that returns different values
-        call_count = [0]
-        def mock_fetchall():
-            call_count[0] += 1
-            # Odd calls are is_connected checks, even calls are actual queries
-            if call_count[0] % 2 == 1:
-                return [[1]]  # is_connected check
-            else:
-                # Return different counts for each stat query
-                return [[call_count[0] * 10]]
+        # Each section is aggregated before the next OPTIONAL MATCH
+        query = mock_cursor.execute.call_args[0][0]
+        assert query.count('OPTIONAL MATCH') == 4
+        assert query.count('WITH note,') == 3
 
-        mock_cursor.fetchall.side_effect = mock_fetchall
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
+    def test_get_graph_stats_returns_dict(self, connected_server):
+        """Test that get_graph_stats returns statistics dict."""
+        server, mock_cursor = connected_server
 
-        server = MemgraphNotesServer()
-        server.connect()
+        # All counts come back from a single query
+        mock_cursor.fetchall.side_effect = [[[10, 20, 30, 40, 50, 60]]]
 
         stats = server.get_graph_stats()
 
@@ -506,20 +717,20 @@ class TestMemgraphServerQueryBuilding:
         for key, value in stats.items():
             assert isinstance(value, int)
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_search_notes_by_title(self, mock_mgclient):
+        assert stats == {
+            'notes': 10, 'tags': 20, 'persons': 30,
+            'links': 40, 'mentions': 50, 'tag_usages': 60,
+        }
+        # A single round-trip
+        assert mock_cursor.execute.call_count == 1
+
+    def test_search_notes_by_title(self, connected_server):
         """Test searching notes by title pattern."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = [
             ['/notes/project-alpha.md', 'Project Alpha'],
             ['/notes/project-beta.md', 'Project Beta']
         ]
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         results = server.search_notes('project')
 
@@ -532,21 +743,14 @@ class TestMemgraphServerQueryBuilding:
         assert len(results) == 2
         assert results[0]['title'] == 'Project Alpha'
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_all_tags_with_counts(self, mock_mgclient):
+    def test_get_all_tags_with_counts(self, connected_server):
         """Test getting all tags with usage counts."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = [
             ['project', 10],
             ['tech', 5],
             ['meeting', 3]
         ]
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         results = server.get_all_tags()
 
@@ -556,20 +760,13 @@ class TestMemgraphServerQueryBuilding:
         assert results[1]['name'] == 'tech'
         assert results[1]['count'] == 5
 
-    @patch('nvim_markdown_notes_memgraph.server.mgclient')
-    def test_get_all_persons_with_counts(self, mock_mgclient):
+    def test_get_all_persons_with_counts(self, connected_server):
         """Test getting all persons with mention counts."""
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+        server, mock_cursor = connected_server
         mock_cursor.fetchall.return_value = [
             ['alice', 15],
             ['bob', 8]
         ]
-        mock_conn.cursor.return_value = mock_cursor
-        mock_mgclient.connect.return_value = mock_conn
-
-        server = MemgraphNotesServer()
-        server.connect()
 
         results = server.get_all_persons()
 
@@ -577,73 +774,253 @@ class TestMemgraphServerQueryBuilding:
         assert results[0]['name'] == 'alice'
         assert results[0]['mention_count'] == 15
 
-    def test_search_note_content_in_files(self):
+    def test_search_note_content_in_files(self, tmp_path):
         """Test full-text search in note content."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Create test notes
-            note1_path = os.path.join(tmpdir, 'note1.md')
-            with open(note1_path, 'w') as f:
-                f.write("# Note One\nThis contains searchterm in content.\n")
+        # Create test notes
+        note1 = tmp_path / 'note1.md'
+        note1.write_text("# Note One\nThis contains searchterm in content.\n")
+        note2 = tmp_path / 'note2.md'
+        note2.write_text("# Note Two\nNo match here.\n")
+        note3 = tmp_path / 'note3.md'
+        note3.write_text("# Note Three\nAlso has SEARCHTERM (case insensitive).\n")
 
-            note2_path = os.path.join(tmpdir, 'note2.md')
-            with open(note2_path, 'w') as f:
-                f.write("# Note Two\nNo match here.\n")
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
 
-            note3_path = os.path.join(tmpdir, 'note3.md')
-            with open(note3_path, 'w') as f:
-                f.write("# Note Three\nAlso has SEARCHTERM (case insensitive).\n")
+        results = server.search_note_content('searchterm')
 
-            server = MemgraphNotesServer(notes_root=tmpdir)
-
-            results = server.search_note_content('searchterm')
+        # Should find note1 and note3
+        assert len(results) == 2
+        paths = [r['path'] for r in results]
+        assert str(note1) in paths
+        assert str(note3) in paths
+        assert str(note2) not in paths
+
+    def test_search_note_content_reports_first_matching_lines(self, tmp_path):
+        """Test line numbers and text of matches from the Python search."""
+        note = tmp_path / "note.md"
+        note.write_text("# Title\nno\n  Hit one  \nhit TWO hit\nno\nhit 3\nhit 4\n")
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        with patch.object(server, '_search_with_ripgrep', return_value=None):
+            results = server.search_note_content('HIT')
+
+        assert results == [{
+            "path": str(note),
+            "title": "Title",
+            "matches": [
+                {"line": 3, "text": "Hit one"},
+                {"line": 4, "text": "hit TWO hit"},
+                {"line": 6, "text": "hit 3"},
+            ],
+        }]
+
+    def test_iter_markdown_files_walks_each_directory_once(self, tmp_path):
+        """Test that symlink loops and aliases do not repeat directories."""
+        (tmp_path / "projects").mkdir()
+        (tmp_path / "projects" / "plan.md").write_text("")
+        # A link back to the root, and a second name for projects/
+        (tmp_path / "projects" / "up").symlink_to(tmp_path)
+        (tmp_path / "alias").symlink_to(tmp_path / "projects")
+
+        found = list(server_module._iter_markdown_files(str(tmp_path), ordered=True))
+
+        # Reported under its real path, not the alias walked first by name
+        assert found == [str(tmp_path / "projects" / "plan.md")]
+
+    @pytest.mark.parametrize("note_path,inside", [
+        ("a.md", True),
+        ("journal/2024-01-01.md", True),
+        ("journal/../a.md", True),
+        ("../secret.md", False),
+        ("journal/../../secret.md", False),
+        ("/etc/passwd", False),
+    ])
+    def test_resolve_note_path_stays_inside_root(self, tmp_path, note_path, inside):
+        """Test that resource paths cannot escape the notes root."""
+        root = str(tmp_path / "notes")
+
+        resolved = server_module._resolve_note_path(root, note_path)
+
+        if inside:
+            assert resolved == os.path.normpath(os.path.join(root, note_path))
+        else:
+            assert resolved is None
+
+    def test_note_page_pages_through_notes_in_name_order(self, tmp_path):
+        """Test that pages of resources resume where the previous one stopped."""
+        (tmp_path / "b").mkdir()
+        (tmp_path / "a").mkdir()
+        for name in ("b/2.md", "b/1.md", "a/1.md", "top.md"):
+            (tmp_path / name).write_text("")
+
+        first, cursor = server_module._note_page(str(tmp_path), None, 3)
+        # Notes added before the cursor do not shift the next page
+        (tmp_path / "a" / "0.md").write_text("")
+        rest, last = server_module._note_page(str(tmp_path), cursor, 3)
+
+        assert first == ["top.md", os.path.join("a", "1.md"), os.path.join("b", "1.md")]
+        assert rest == [os.path.join("b", "2.md")]
+        assert last is None
+
+    def test_note_page_skips_folders_before_cursor(self, tmp_path):
+        """Test that resuming does not reread folders listed on earlier pages."""
+        for folder in ("a", "b"):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / "1.md").write_text("")
+            (tmp_path / folder / "2.md").write_text("")
+        _, cursor = server_module._note_page(str(tmp_path), None, 3)
+
+        scanned = []
+        real_scandir = os.scandir
+        def scandir(path):
+            scanned.append(path)
+            return real_scandir(path)
+
+        with patch.object(server_module.os, 'scandir', side_effect=scandir):
+            rest, _ = server_module._note_page(str(tmp_path), cursor, 3)
+
+        assert rest == [os.path.join("b", "2.md")]
+        assert str(tmp_path / "a") not in scanned
+
+    def test_note_page_keeps_symlinks_found_before_cursor(self, tmp_path):
+        """Test that a symlinked folder inside a skipped folder is still listed."""
+        root = tmp_path / "notes"
+        for name in ("a/1.md", "b/1.md"):
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text("")
+        (tmp_path / "outside").mkdir()
+        (tmp_path / "outside" / "x.md").write_text("")
+        # Walked after the real tree, although a/ sorts before b/
+        (root / "a" / "link").symlink_to(tmp_path / "outside")
+        # A second name for b/, which is only listed once
+        (root / "alias").symlink_to(root / "b")
+
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = server_module._note_page(str(root), cursor, 1)
+            pages += page
+            if cursor is None:
+                break
+
+        assert pages == [
+            os.path.join("a", "1.md"),
+            os.path.join("b", "1.md"),
+            os.path.join("a", "link", "x.md"),
+        ]
 
-            # Should find note1 and note3
-            assert len(results) == 2
-            paths = [r['path'] for r in results]
-            assert note1_path in paths
-            assert note3_path in paths
-            assert note2_path not in paths
+    @pytest.mark.parametrize("cursor", ["3", "not json", '["../outside.md"]', '["a.md", "sub"]'])
+    def test_note_page_rejects_invalid_cursor(self, tmp_path, cursor):
+        """Test that a malformed or escaping cursor is an error, not an empty page."""
+        (tmp_path / "sub").mkdir()
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            server_module._note_page(str(tmp_path), cursor, 3)
+
+    @pytest.mark.parametrize("has_orjson", [True, False])
+    def test_to_json_indents_tool_results(self, has_orjson):
+        """Test that tool results serialize the same with and without orjson."""
+        results = [{"path": "/notes/caf\u00e9.md", "line": 3, "tags": ["a", "b"]}]
+        with patch.object(server_module, 'HAS_ORJSON', has_orjson and server_module.HAS_ORJSON):
+            text = server_module._to_json(results)
+
+        assert json.loads(text) == results
+        assert '\n  {' in text
+
+    def test_iter_markdown_files_skips_hidden_entries(self, tmp_path):
+        """Test that the notes walk recurses but skips hidden and ignored entries."""
+        (tmp_path / "top.md").write_text("# Top\n")
+        (tmp_path / "image.png").write_text("")
+        (tmp_path / "journal" / "2024").mkdir(parents=True)
+        (tmp_path / "journal" / "2024" / "2024-01-01.md").write_text("# Day\n")
+        (tmp_path / ".obsidian").mkdir()
+        (tmp_path / ".obsidian" / "hidden.md").write_text("")
+        (tmp_path / ".draft.md").write_text("")
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "README.md").write_text("")
+
+        found = sorted(server_module._iter_markdown_files(str(tmp_path)))
+
+        assert found == [
+            str(tmp_path / "journal" / "2024" / "2024-01-01.md"),
+            str(tmp_path / "top.md"),
+        ]
 
-    def test_find_journals_by_date_range_query(self):
+    def test_search_note_content_with_ripgrep(self, tmp_path):
+        """Test that ripgrep JSON output is grouped into per-file results."""
+        note = tmp_path / "note.md"
+        note.write_text("# Found It\nfirst hit\nsecond hit\n")
+
+        def rg_match(path, line_number, text):
+            return json.dumps({"type": "match", "data": {
+                "path": {"text": path},
+                "lines": {"text": text + "\n"},
+                "line_number": line_number,
+            }}).encode() + b"\n"
+
+        stdout = (
+            json.dumps({"type": "begin", "data": {"path": {"text": str(note)}}}).encode() + b"\n"
+            + rg_match(str(note), 2, "first hit")
+            + rg_match(str(note), 3, "  second hit  ")
+        )
+        proc = MagicMock(returncode=0)
+        proc.stdout.__iter__.return_value = iter(stdout.splitlines(keepends=True))
+
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+        with patch('nvim_markdown_notes_memgraph.server.subprocess.Popen', return_value=proc) as mock_popen:
+            results = server.search_note_content('hit')
+
+        command = mock_popen.call_args[0][0]
+        assert command[0] == 'rg'
+        assert '--fixed-strings' in command and '--no-ignore' in command
+        assert results == [{
+            "path": str(note),
+            "title": "Found It",
+            "matches": [{"line": 2, "text": "first hit"}, {"line": 3, "text": "second hit"}],
+        }]
+
+    def test_search_note_content_without_ripgrep(self, tmp_path):
+        """Test the Python scan when rg is not installed."""
+        (tmp_path / "note.md").write_text("# Title\nneedle here\n")
+        server = MemgraphNotesServer(notes_root=str(tmp_path))
+
+        with patch('nvim_markdown_notes_memgraph.server.subprocess.Popen', side_effect=FileNotFoundError):
+            results = server.search_note_content('NEEDLE')
+
+        assert results == [{
+            "path": str(tmp_path / "note.md"),
+            "title": "Title",
+            "matches": [{"line": 2, "text": "needle here"}],
+        }]
+
+    def test_find_journals_by_date_range_query(self, connected_server):
         """Test journal date range query building."""
-        with patch('nvim_markdown_notes_memgraph.server.mgclient') as mock_mgclient:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_cursor.fetchall.return_value = [
-                ['/notes/journal/2024-01-15.md', '2024-01-15', '2024-01-15.md']
-            ]
-            mock_conn.cursor.return_value = mock_cursor
-            mock_mgclient.connect.return_value = mock_conn
-
-            server = MemgraphNotesServer()
-            server.connect()
+        server, mock_cursor = connected_server
+        mock_cursor.fetchall.return_value = [
+            ['/notes/journal/2024-01-15.md', '2024-01-15', '2024-01-15.md']
+        ]
 
-            results = server.find_journals_by_date_range('2024-01-15', '2024-01-20')
+        results = server.find_journals_by_date_range('2024-01-15', '2024-01-20')
 
-            # Verify query parameters
-            call_args = mock_cursor.execute.call_args
-            params = call_args[0][1]
-            assert params['start_date'] == '2024-01-15'
-            assert params['end_date'] == '2024-01-20'
+        # Verify query parameters
+        call_args = mock_cursor.execute.call_args
+        params = call_args[0][1]
+        assert params['start_date'] == '2024-01-15'
+        assert params['end_date'] == '2024-01-20'
 
-    def test_find_notes_by_filename_pattern_query(self):
+    def test_find_notes_by_filename_pattern_query(self, connected_server):
         """Test filename pattern search query building."""
-        with patch('nvim_markdown_notes_memgraph.server.mgclient') as mock_mgclient:
-            mock_conn = MagicMock()
-            mock_cursor = MagicMock()
-            mock_cursor.fetchall.return_value = []
-            mock_conn.cursor.return_value = mock_cursor
-            mock_mgclient.connect.return_value = mock_conn
-
-            server = MemgraphNotesServer()
-            server.connect()
+        server, mock_cursor = connected_server
+        mock_cursor.fetchall.return_value = []
 
-            server.find_notes_by_filename_pattern('test')
+        server.find_notes_by_filename_pattern('test')
 
-            # Verify query was called with pattern
-            call_args = mock_cursor.execute.call_args
-            params = call_args[0][1]
-            assert params['pattern'] == 'test'
+        # Verify query was called with pattern
+        call_args = mock_cursor.execute.call_args
+        params = call_args[0][1]
+        assert params['pattern'] == 'test'
+        # Compares the stored lowercase copies rather than lowering every note
+        assert 'coalesce(n.filename_lower' in call_args[0][0]
+        assert 'coalesce(n.title_lower' in call_args[0][0]
 
 
 class TestConnectionManagement:
@@ -719,3 +1096,89 @@ class TestConnectionManagement:
 
         assert result is True
         assert server.connection is not None
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_query_converts_graph_objects_unless_raw(self, mock_mgclient):
+        """Test that nodes become property dicts, and raw rows pass through."""
+        node = MagicMock(properties={'path': '/notes/a.md'})
+        rows = [(node, 'a')]
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.fetchall.return_value = rows
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        assert server.query("MATCH (n) RETURN n, 'a'") == [[{'path': '/notes/a.md'}, 'a']]
+        assert server.query("MATCH (n) RETURN n, 'a'", raw=True) is rows
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_query_does_not_probe_connection(self, mock_mgclient):
+        """Test that query() runs only the requested statement."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [[1]]
+        mock_conn.cursor.return_value = mock_cursor
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer()
+        server.connect()
+        server.query("MATCH (n) RETURN count(n)")
+
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert statements == ["MATCH (n) RETURN count(n)"]
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_query_reconnects_when_connection_lost(self, mock_mgclient):
+        """Test that a query failing on a dropped connection is retried once."""
+        dead_conn = MagicMock()
+        dead_conn.cursor.return_value.execute.side_effect = Exception("Connection lost")
+        dead_conn.status = mock_mgclient.CONN_STATUS_BAD
+        live_conn = MagicMock()
+        live_conn.cursor.return_value.fetchall.return_value = [[1]]
+        mock_mgclient.connect.side_effect = [dead_conn, live_conn]
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        assert server.query("RETURN 1") == [[1]]
+        assert server.connection is live_conn
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_query_error_on_live_connection_is_raised(self, mock_mgclient):
+        """Test that query errors are not retried while the connection is fine."""
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.execute.side_effect = Exception("Syntax error")
+        mock_conn.status = mock_mgclient.CONN_STATUS_READY
+        mock_mgclient.connect.return_value = mock_conn
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        with pytest.raises(Exception, match="Syntax error"):
+            server.query("RETRUN 1")
+        assert mock_mgclient.connect.call_count == 1
+
+    @patch('nvim_markdown_notes_memgraph.server.mgclient')
+    def test_connection_is_per_thread(self, mock_mgclient):
+        """Test that each thread gets its own connection."""
+        import threading
+
+        main_conn, worker_conn = MagicMock(), MagicMock()
+        mock_mgclient.connect.side_effect = [main_conn, worker_conn]
+
+        server = MemgraphNotesServer()
+        server.connect()
+
+        seen = []
+        def worker():
+            seen.append(server.connection)
+            server.ensure_connected()
+            seen.append(server.connection)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen == [None, worker_conn]
+        assert server.connection is main_conn